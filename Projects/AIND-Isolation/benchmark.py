@@ -0,0 +1,353 @@
+"""Measure the search throughput of the isolation agents on a fixed corpus of
+mid-game positions.
+
+Every position in the corpus is reached by a seeded random playout, so the
+same seed always produces the same positions. For each agent, heuristic and
+search depth the benchmark reports the nodes searched, the time to complete
+the depth, the number of alpha-beta cutoffs, the time spent inside `score()`,
+and the effective branching factor. Results can be saved as JSON to compare
+different commits.
+
+With --parallel N, the benchmark instead measures the speedup of
+`ParallelAlphaBetaPlayer` searching the corpus to a fixed depth with 1 to N
+worker processes. With --sizes, it measures how the alpha-beta node rate
+and the time of an agent's first move change with the board size.
+
+Example:
+
+    python benchmark.py --depth 5 --output before.json
+    python benchmark.py --depth 6 --parallel 4
+    python benchmark.py --depth 4 --sizes 7 11 15 25
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+import timeit
+
+from collections import namedtuple
+
+from isolation import Board
+from sample_players import improved_score
+from game_agent import (MinimaxPlayer, AlphaBetaPlayer,
+                        ParallelAlphaBetaPlayer, custom_score,
+                        custom_score_2, custom_score_3, batch_improved_score,
+                        batch_custom_score, batch_custom_score_2,
+                        batch_custom_score_3)
+
+NUM_POSITIONS = 20  # number of positions in the corpus
+MAX_DEPTH = 5  # deepest search depth measured
+SEED = 0  # seed of the corpus playouts
+DEADLINE_MILLIS = 3600 * 1000.  # search deadline, never reached in practice
+
+AGENTS = {
+    "minimax": MinimaxPlayer,
+    "alphabeta": AlphaBetaPlayer,
+}
+
+HEURISTICS = {
+    "improved": improved_score,
+    "custom": custom_score,
+    "custom_2": custom_score_2,
+    "custom_3": custom_score_3,
+}
+
+# Vectorized versions of the heuristics, used with --batch
+BATCH_HEURISTICS = {
+    "improved": batch_improved_score,
+    "custom": batch_custom_score,
+    "custom_2": batch_custom_score_2,
+    "custom_3": batch_custom_score_3,
+}
+
+Result = namedtuple("Result", ["agent", "heuristic", "depth", "nodes",
+                               "seconds", "cutoffs", "score_seconds",
+                               "score_calls"])
+
+
+def make_positions(num_positions, seed, min_moves=6, max_moves=20, width=7,
+                   height=7):
+    """Return a list of move sequences, each leading from the empty board to
+    a mid-game position where player 1 is to move and both players still
+    have at least two legal moves.
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < num_positions:
+        game = Board("Player1", "Player2", width, height, shuffle_moves=False)
+        num_moves = 2 * rng.randint(min_moves // 2, max_moves // 2)
+        moves = []
+        for _ in range(num_moves):
+            legal_moves = game.get_legal_moves()
+            if not legal_moves:
+                break
+            moves.append(rng.choice(legal_moves))
+            game.apply_move(moves[-1])
+        if (len(moves) == num_moves and
+                len(game.get_legal_moves("Player1")) > 1 and
+                len(game.get_legal_moves("Player2")) > 1):
+            positions.append(moves)
+    return positions
+
+
+class TimedScore:
+    """Wrap a heuristic to count the calls and the time spent inside it. """
+
+    def __init__(self, score_fn):
+        self.score_fn = score_fn
+        self.calls = 0
+        self.seconds = 0.
+
+    def __call__(self, *args):
+        start = timeit.default_timer()
+        value = self.score_fn(*args)
+        self.seconds += timeit.default_timer() - start
+        self.calls += 1
+        return value
+
+
+def run_position(agent_cls, score_fn, moves, max_depth, batch_score_fn=None,
+                 check_every_node=False, width=7, height=7):
+    """Search one position with iterative deepening up to `max_depth` and
+    return a list of (nodes, seconds, cutoffs, score_seconds, score_calls)
+    for each depth, measured cumulatively from the start of the search.
+    Batch evaluations count as one call each.
+
+    The search reads a real clock, as in a game, against a deadline far
+    enough away to never expire. With `check_every_node`, the clock is read
+    at every node instead of at the adaptive interval.
+    """
+    score = TimedScore(score_fn)
+    batch_score = TimedScore(batch_score_fn) if batch_score_fn else None
+    player = agent_cls(score_fn=score, batch_score_fn=batch_score)
+    if check_every_node:
+        player.MAX_CHECK_INTERVAL = 1
+    timers = [t for t in (score, batch_score) if t is not None]
+    game = Board(player, "Opponent", width, height, shuffle_moves=False)
+    for move in moves:
+        game.apply_move(move)
+
+    if agent_cls is MinimaxPlayer:
+        search = player.minimax
+    else:
+        search = lambda game, depth: player.aspiration_search(game, depth,
+                                                              player.root_score)
+    start = timeit.default_timer()
+    player.time_left = lambda: DEADLINE_MILLIS - 1000 * (timeit.default_timer() - start)
+    player.nodes_searched = 0
+    player.cutoffs = 0
+    player.reset_clock()
+    stats = []
+    for depth in range(1, max_depth + 1):
+        search(game, depth)
+        stats.append((player.nodes_searched, timeit.default_timer() - start,
+                      player.cutoffs, sum(t.seconds for t in timers),
+                      sum(t.calls for t in timers)))
+    return stats
+
+
+def run_benchmark(agents, heuristics, positions, max_depth, batch=False,
+                  check_every_node=False):
+    """Return a list of `Result` totals over all positions for every
+    combination of agent, heuristic and depth. With `batch`, the agents
+    score the leaves with the vectorized heuristics. With `check_every_node`,
+    the agents read the clock at every node.
+    """
+    results = []
+    for agent_name in agents:
+        for heuristic_name in heuristics:
+            totals = [[0] * 5 for _ in range(max_depth)]
+            for moves in positions:
+                stats = run_position(AGENTS[agent_name],
+                                     HEURISTICS[heuristic_name],
+                                     moves, max_depth,
+                                     batch and BATCH_HEURISTICS[heuristic_name],
+                                     check_every_node)
+                for total, depth_stats in zip(totals, stats):
+                    for i, value in enumerate(depth_stats):
+                        total[i] += value
+            for depth, total in enumerate(totals, 1):
+                results.append(Result(agent_name, heuristic_name, depth,
+                                      *total))
+    return results
+
+
+def run_parallel(heuristic, positions, depth, max_workers):
+    """Search every position to `depth` with 1 to `max_workers` workers and
+    return a list of (workers, nodes, seconds) totals over all positions.
+    The worker pools are started before timing.
+    """
+    results = []
+    for workers in range(1, max_workers + 1):
+        player = ParallelAlphaBetaPlayer(score_fn=HEURISTICS[heuristic],
+                                         workers=workers)
+        player.time_left = lambda: float("inf")
+        player.start()
+        nodes = 0
+        seconds = 0.
+        try:
+            for moves in positions:
+                game = Board(player, "Opponent", shuffle_moves=False)
+                for move in moves:
+                    game.apply_move(move)
+                start = timeit.default_timer()
+                player.parallel_search(game, depth)
+                seconds += timeit.default_timer() - start
+                nodes += player.nodes_searched
+                player.nodes_searched = 0
+        finally:
+            player.close()
+        results.append((workers, nodes, seconds))
+    return results
+
+
+def run_sizes(heuristic, sizes, num_positions, seed, depth):
+    """Search corpora of positions on square boards of each of `sizes` to
+    `depth` with alpha-beta and return a list of (size, nodes, seconds,
+    first_move_seconds) totals, where the last entry is the time taken by
+    `get_move()` for the first move of a player on the empty board.
+    """
+    results = []
+    for size in sizes:
+        nodes = 0
+        seconds = 0.
+        for moves in make_positions(num_positions, seed, width=size, height=size):
+            stats = run_position(AlphaBetaPlayer, HEURISTICS[heuristic], moves,
+                                 depth, width=size, height=size)
+            nodes += stats[-1][0]
+            seconds += stats[-1][1]
+
+        player = AlphaBetaPlayer(score_fn=HEURISTICS[heuristic])
+        game = Board(player, "Opponent", size, size)
+        start = timeit.default_timer()
+        player.get_move(game, lambda: DEADLINE_MILLIS)
+        results.append((size, nodes, seconds, timeit.default_timer() - start))
+    return results
+
+
+def print_size_results(results):
+    header = "{:>6}{:>11}{:>10}{:>11}{:>16}".format(
+        "Size", "Nodes", "Time(s)", "Nodes/s", "First move(ms)")
+    print(header)
+    print("-" * len(header))
+    for size, nodes, seconds, first_move_seconds in results:
+        print("{:>6}{:>11}{:>10.3f}{:>11.0f}{:>16.3f}".format(
+            "{0}x{0}".format(size), nodes, seconds, nodes / max(seconds, 1e-9),
+            1000 * first_move_seconds))
+
+
+def print_parallel_results(results):
+    header = "{:>8}{:>11}{:>10}{:>11}{:>9}".format(
+        "Workers", "Nodes", "Time(s)", "Nodes/s", "Speedup")
+    print(header)
+    print("-" * len(header))
+    base_seconds = results[0][2]
+    for workers, nodes, seconds in results:
+        print("{:>8}{:>11}{:>10.3f}{:>11.0f}{:>8.2f}x".format(
+            workers, nodes, seconds, nodes / max(seconds, 1e-9),
+            base_seconds / max(seconds, 1e-9)))
+
+
+def effective_branching_factor(results, result):
+    """Return the ratio of the nodes searched to complete the depth of
+    `result` to the nodes searched to complete one ply less by the same
+    agent and heuristic. Node counts are cumulative from depth 1, as in an
+    iterative deepening search.
+    """
+    for other in results:
+        if (other.agent, other.heuristic, other.depth) == \
+                (result.agent, result.heuristic, result.depth - 1):
+            return result.nodes / other.nodes if other.nodes else None
+    return None
+
+
+def print_results(results):
+    header = "{:<10}{:<10}{:>6}{:>11}{:>10}{:>11}{:>10}{:>9}{:>7}".format(
+        "Agent", "Score", "Depth", "Nodes", "Time(s)", "Nodes/s",
+        "Cutoffs", "Score%", "EBF")
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        ebf = effective_branching_factor(results, result)
+        print("{:<10}{:<10}{:>6}{:>11}{:>10.3f}{:>11.0f}{:>10}{:>8.1f}%{:>7}".format(
+            result.agent, result.heuristic, result.depth, result.nodes,
+            result.seconds, result.nodes / max(result.seconds, 1e-9),
+            result.cutoffs, 100 * result.score_seconds / max(result.seconds, 1e-9),
+            "{:.2f}".format(ebf) if ebf else "-"))
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(results, path, args):
+    data = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "positions": args.positions,
+        "seed": args.seed,
+        "batch": args.batch,
+        "check_every_node": args.check_every_node,
+        "results": [dict(result._asdict(),
+                         effective_branching_factor=effective_branching_factor(results, result))
+                    for result in results],
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--depth", type=int, default=MAX_DEPTH,
+                        help="deepest search depth to measure")
+    parser.add_argument("--positions", type=int, default=NUM_POSITIONS,
+                        help="number of positions in the corpus")
+    parser.add_argument("--seed", type=int, default=SEED,
+                        help="seed of the corpus playouts")
+    parser.add_argument("--agents", nargs="+", choices=sorted(AGENTS),
+                        default=sorted(AGENTS))
+    parser.add_argument("--heuristics", nargs="+", choices=sorted(HEURISTICS),
+                        default=sorted(HEURISTICS))
+    parser.add_argument("--batch", action="store_true",
+                        help="score leaves with the vectorized heuristics")
+    parser.add_argument("--check-every-node", action="store_true",
+                        help="read the clock at every node instead of at "
+                             "the adaptive interval")
+    parser.add_argument("--parallel", type=int, metavar="N",
+                        help="measure the speedup of the parallel search "
+                             "with 1 to N workers instead")
+    parser.add_argument("--sizes", type=int, nargs="+", metavar="N",
+                        help="measure the node rate on N x N boards of each "
+                             "size instead")
+    parser.add_argument("--output", help="save the results to this JSON file")
+    args = parser.parse_args()
+
+    positions = make_positions(args.positions, args.seed)
+    if args.parallel:
+        for heuristic in args.heuristics:
+            print("Heuristic: {}".format(heuristic))
+            print_parallel_results(run_parallel(heuristic, positions,
+                                                args.depth, args.parallel))
+        return
+    if args.sizes:
+        for heuristic in args.heuristics:
+            print("Heuristic: {}".format(heuristic))
+            print_size_results(run_sizes(heuristic, args.sizes, args.positions,
+                                         args.seed, args.depth))
+        return
+    results = run_benchmark(args.agents, args.heuristics, positions,
+                            args.depth, args.batch, args.check_every_node)
+    print_results(results)
+    if args.output:
+        save_results(results, args.output, args)
+
+
+if __name__ == "__main__":
+    main()
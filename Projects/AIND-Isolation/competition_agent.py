@@ -4,6 +4,7 @@ champions) in a tournament.
 
          COMPLETING AND SUBMITTING A COMPETITION AGENT IS OPTIONAL
 """
+import math
 import random
 
 
@@ -12,6 +13,47 @@ class SearchTimeout(Exception):
     pass
 
 
+class MCTSNode:
+    """A node of the Monte Carlo search tree.
+
+    Nodes identify the player who made the move into the node by the parity
+    of the move count before that move, rather than by player object, so a
+    tree stays valid whichever objects are registered on the board.
+
+    Parameters
+    ----------
+    state_hash : int
+        The `Board.hash()` of the position this node represents.
+
+    moves : list<(int, int)>
+        The legal moves of the player to move in this position.
+
+    mover_parity : int
+        The parity of the move count before the move into this node.
+
+    parent : MCTSNode (optional)
+        The node of the position before the move into this node.
+    """
+    __slots__ = ("state_hash", "untried", "children", "mover_parity",
+                 "parent", "wins", "visits")
+
+    def __init__(self, state_hash, moves, mover_parity, parent=None):
+        self.state_hash = state_hash
+        self.untried = moves
+        self.children = {}
+        self.mover_parity = mover_parity
+        self.parent = parent
+        self.wins = 0.
+        self.visits = 0
+
+    def select_child(self, exploration):
+        """Return the (move, child) with the highest UCT value. """
+        log_visits = math.log(self.visits)
+        return max(self.children.items(),
+                   key=lambda item: (item[1].wins / item[1].visits +
+                                     exploration * math.sqrt(log_visits / item[1].visits)))
+
+
 def custom_score(game, player):
     """Calculate the heuristic value of a game state from the point of view
     of the given player.
@@ -49,6 +91,11 @@ class CustomPlayer:
         COMPETITION.  IT IS NOT REQUIRED FOR THE ISOLATION PROJECT REVIEW.
     **************************************************************************
 
+    This agent uses Monte Carlo Tree Search with UCT selection. Rollouts are
+    played in-place on a single copy of the board with push_move() and taken
+    back with pop_move(). The subtree of the position reached after the
+    opponent's reply is kept for the next move.
+
     Parameters
     ----------
     data : string
@@ -59,12 +106,31 @@ class CustomPlayer:
         the PvP competition uses more accurate timers that are not cross-
         platform compatible, so a limit of 1ms (vs 10ms for the other classes)
         is generally sufficient.
+
+    exploration : float (optional)
+        The exploration constant of the UCT formula.
+
+    rollout_policy : str (optional)
+        "mobility" to bias rollout moves toward squares with more onward
+        moves for the mover, or "random" for uniformly random rollouts.
     """
 
-    def __init__(self, data=None, timeout=1.):
+    def __init__(self, data=None, timeout=1., exploration=math.sqrt(2),
+                 rollout_policy="mobility"):
         self.score = custom_score
         self.time_left = None
         self.TIMER_THRESHOLD = timeout
+        self.exploration = exploration
+        self.rollout_policy = rollout_policy
+        self.iterations = 0
+        self._root = None
+
+    def __getstate__(self):
+        # The clock of the last move is a function local to Board.play(),
+        # which cannot be pickled to send the player to a worker process
+        state = self.__dict__.copy()
+        state["time_left"] = None
+        return state
 
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -94,4 +160,95 @@ class CustomPlayer:
             (-1, -1) if there are no available legal moves.
         """
         # OPTIONAL: Finish this function!
-        raise NotImplementedError
+        self.time_left = time_left
+        legal_moves = game.get_legal_moves()
+        if not legal_moves:
+            return (-1, -1)
+
+        game = game.copy()
+        root = self._reuse_tree(game)
+        if root is None:
+            root = MCTSNode(game.hash(), legal_moves, 1 - game.move_count % 2)
+
+        self.iterations = 0
+        while self.time_left() > self.TIMER_THRESHOLD:
+            self._iterate(root, game)
+            self.iterations += 1
+
+        if not root.children:
+            return legal_moves[0]
+        best_move, _ = max(root.children.items(), key=lambda item: item[1].visits)
+        self._root = root
+        self._last_move = best_move
+        return best_move
+
+    def _reuse_tree(self, game):
+        """Return the subtree of the previous search for the position after
+        our last move and the opponent's reply, or None if it was not kept.
+        """
+        root, self._root = self._root, None
+        if root is None:
+            return None
+        node = root.children.get(self._last_move)
+        if node is None:
+            return None
+        node = node.children.get(game.get_player_location(game.inactive_player))
+        if node is None or node.state_hash != game.hash():
+            return None
+        node.parent = None
+        return node
+
+    def _iterate(self, root, game):
+        """Run one select, expand, rollout and backpropagate iteration,
+        leaving the board as it was found.
+        """
+        node = root
+        depth = 0
+        while not node.untried and node.children:
+            move, node = node.select_child(self.exploration)
+            game.push_move(move)
+            depth += 1
+
+        if node.untried:
+            move = node.untried.pop(random.randrange(len(node.untried)))
+            parity = game.move_count % 2
+            game.push_move(move)
+            depth += 1
+            child = MCTSNode(game.hash(), game.get_legal_moves(), parity, node)
+            node.children[move] = child
+            node = child
+
+        depth += self._rollout(game)
+        loser_parity = game.move_count % 2
+        for _ in range(depth):
+            game.pop_move()
+
+        while node is not None:
+            node.visits += 1
+            if node.mover_parity != loser_parity:
+                node.wins += 1
+            node = node.parent
+
+    def _rollout(self, game):
+        """Play random moves in-place until the player to move is stuck, and
+        return the number of moves played.
+        """
+        num_moves = 0
+        moves = game.get_legal_moves()
+        while moves:
+            if self.rollout_policy == "mobility" and len(moves) > 1:
+                # Play the better of two random candidates by the number of
+                # moves the mover would have from its new square
+                candidates = random.sample(moves, 2)
+                mobility = []
+                for m in candidates:
+                    game.push_move(m)
+                    mobility.append(len(game.get_legal_moves(game.inactive_player)))
+                    game.pop_move()
+                move = candidates[mobility[1] > mobility[0]]
+            else:
+                move = random.choice(moves)
+            game.push_move(move)
+            num_moves += 1
+            moves = game.get_legal_moves()
+        return num_moves
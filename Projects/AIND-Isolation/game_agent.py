@@ -2,8 +2,17 @@
 test your agent's strength against a set of known agents using tournament.py
 and include the results in your report.
 """
+import functools
 import random
 import math
+import multiprocessing
+import os
+import time
+
+from array import array
+from collections import namedtuple
+
+import numpy as np
 
 
 class SearchTimeout(Exception):
@@ -11,6 +20,17 @@ class SearchTimeout(Exception):
     pass
 
 
+def _next_float(x, toward):
+    """Return the float next to `x` in the direction of `toward`, used as
+    the edge of a null window. `math.nextafter` is only available from
+    Python 3.9, so older versions step by a fixed relative epsilon.
+    """
+    if hasattr(math, "nextafter"):
+        return math.nextafter(x, toward)
+    step = max(abs(x), 1.) * 1e-12
+    return x + step if toward > x else x - step
+
+
 def custom_score(game, player):
     """Calculate the heuristic value of a game state from the point of view
     of the given player.
@@ -47,11 +67,9 @@ def custom_score(game, player):
     y2_mirror, x2_mirror = game.height - y2 - 1, game.width - x2 - 1
     distance = math.sqrt((y2_mirror - y1)**2 + (x2_mirror - x1)**2)
 
-    own_moves = game.get_legal_moves(player)
-    opp_moves = game.get_legal_moves(game.get_opponent(player))
-    own_moves_num = len(own_moves)
-    opp_moves_num = len(opp_moves)
-    blank_space_num = len(game.get_blank_spaces())
+    own_moves_num = game.count_legal_moves(player)
+    opp_moves_num = game.count_legal_moves(game.get_opponent(player))
+    blank_space_num = game.count_blank_spaces()
     distance_weight = blank_space_num / (game.height * game.width)
 
     return float(own_moves_num - opp_moves_num - distance_weight * distance)
@@ -91,11 +109,9 @@ def custom_score_2(game, player):
     distance = math.sqrt((y2 - y1)**2 + (x2 - x1)**2)
     distance_offset = math.sqrt(2**2 + 1**2)
 
-    own_moves = game.get_legal_moves(player)
-    opp_moves = game.get_legal_moves(game.get_opponent(player))
-    own_moves_num = len(own_moves)
-    opp_moves_num = len(opp_moves)
-    blank_space_num = len(game.get_blank_spaces())
+    own_moves_num = game.count_legal_moves(player)
+    opp_moves_num = game.count_legal_moves(game.get_opponent(player))
+    blank_space_num = game.count_blank_spaces()
     distance_weight = blank_space_num / (game.height * game.width)
 
     return float(own_moves_num - opp_moves_num - distance_weight * abs(distance - distance_offset))
@@ -130,8 +146,8 @@ def custom_score_3(game, player):
     if game.is_winner(player):
         return float("inf")
     
-    own_moves = game.get_legal_moves(player)
-    opp_moves = game.get_legal_moves(game.get_opponent(player))
+    own_moves = game.get_legal_move_indexes(player)
+    opp_moves = game.get_legal_move_indexes(game.get_opponent(player))
 
     own_moves_num = len(own_moves)
     opp_moves_num = len(opp_moves)
@@ -141,6 +157,529 @@ def custom_score_3(game, player):
     return float(own_moves_num - opp_moves_num)
 
 
+class WeightedScore:
+    """Heuristic combining the terms of `custom_score` and `custom_score_2`
+    with adjustable weights, for tuning the weights by self-play (see
+    tuning.py). Instances are picklable, so players using them can be sent
+    to worker processes.
+
+    The value of a state is
+
+        own_moves * (number of legal moves of the player)
+        - opp_moves * (number of legal moves of the opponent)
+        - (fraction of blank cells) * (
+            mirror_distance * (distance to the mirror image of the opponent)
+            + knight_distance * |distance to the opponent - sqrt(5)|)
+
+    The defaults give the same values as `custom_score`.
+    """
+    PARAMETERS = ("own_moves", "opp_moves", "mirror_distance", "knight_distance")
+
+    def __init__(self, own_moves=1., opp_moves=1., mirror_distance=1.,
+                 knight_distance=0.):
+        self.own_moves = own_moves
+        self.opp_moves = opp_moves
+        self.mirror_distance = mirror_distance
+        self.knight_distance = knight_distance
+
+    def weights(self):
+        """Return a dict of the weights, keyed by parameter name. """
+        return {name: getattr(self, name) for name in self.PARAMETERS}
+
+    def __repr__(self):
+        return "WeightedScore({})".format(", ".join(
+            "{}={!r}".format(name, value) for name, value in self.weights().items()))
+
+    def __call__(self, game, player):
+        if game.is_loser(player):
+            return float("-inf")
+
+        if game.is_winner(player):
+            return float("inf")
+
+        opponent = game.get_opponent(player)
+        y1, x1 = game.get_player_location(player)
+        y2, x2 = game.get_player_location(opponent)
+        y2_mirror, x2_mirror = game.height - y2 - 1, game.width - x2 - 1
+        mirror_distance = math.sqrt((y2_mirror - y1)**2 + (x2_mirror - x1)**2)
+        knight_distance = abs(math.sqrt((y2 - y1)**2 + (x2 - x1)**2) - math.sqrt(5))
+        distance_weight = game.count_blank_spaces() / (game.height * game.width)
+
+        return float(self.own_moves * game.count_legal_moves(player) -
+                     self.opp_moves * game.count_legal_moves(opponent) -
+                     distance_weight * (self.mirror_distance * mirror_distance +
+                                        self.knight_distance * knight_distance))
+
+
+# Knight move neighbor tables used by the batch heuristics, keyed by the
+# board (width, height)
+_neighbor_tables = {}
+
+
+def _neighbor_table(game):
+    """Return an array with one row per cell index of `game` holding the
+    indexes of the cells a knight move away, padded from the board's
+    neighbor table with an extra sentinel cell (index width * height), which
+    is always treated as blocked.
+    """
+    width, height = game.width, game.height
+    table = _neighbor_tables.get((width, height))
+    if table is None:
+        num_cells = width * height
+        table = np.full((num_cells + 1, 8), num_cells, dtype=np.intp)
+        for idx, neighbors in enumerate(game.neighbor_table(width, height)):
+            table[idx, :len(neighbors)] = neighbors
+        _neighbor_tables[(width, height)] = table
+    return table
+
+
+def _child_features(game, player, moves):
+    """Compute the features used by the heuristics for every child of `game`
+    reached by one of `moves`, without building the child boards.
+
+    Returns a dict of NumPy arrays (one entry per move) holding the mobility
+    of `player` ("own") and of its opponent ("opp"), whether their move sets
+    overlap, and the locations of both players, along with the number of
+    blank cells shared by all children. "terminal" holds +1 where `player`
+    has won, -1 where `player` has lost, and 0 otherwise.
+    """
+    height, width = game.height, game.width
+    num_cells = width * height
+    neighbors = _neighbor_table(game)
+
+    blank = np.zeros(num_cells + 1, dtype=bool)
+    blank_spaces = game.get_blank_spaces()
+    blank[[r + c * height for r, c in blank_spaces]] = True
+    num_blank = len(blank_spaces) - 1
+
+    # The active player (the "mover") moves to each idx, after which the
+    # inactive player is to move from its current location
+    idx = np.array([r + c * height for r, c in moves], dtype=np.intp)
+    mover_neighbors = neighbors[idx]
+    mover_open = blank[mover_neighbors]
+    mover_mobility = mover_open.sum(axis=1)
+
+    other_loc = game.get_player_location(game.inactive_player)
+    if other_loc is None:
+        other_mobility = np.full(len(moves), num_blank)
+        overlap = mover_mobility > 0
+    else:
+        other_idx = other_loc[0] + other_loc[1] * height
+        other_neighbors = neighbors[other_idx]
+        other_mobility = (blank[other_neighbors].sum() -
+                          (idx[:, None] == other_neighbors).any(axis=1))
+        in_other = np.zeros(num_cells + 1, dtype=bool)
+        in_other[other_neighbors] = True
+        in_other[num_cells] = False
+        overlap = (mover_open & in_other[mover_neighbors]).any(axis=1)
+
+    mover_loc = (idx % height, idx // height)
+    if player == game.active_player:
+        own, opp = mover_mobility, other_mobility
+        own_loc, opp_loc = mover_loc, other_loc
+        terminal = np.where(other_mobility == 0, 1, 0)
+    else:
+        own, opp = other_mobility, mover_mobility
+        own_loc, opp_loc = other_loc, mover_loc
+        terminal = np.where(other_mobility == 0, -1, 0)
+
+    return {"own": own, "opp": opp, "overlap": overlap, "own_loc": own_loc,
+            "opp_loc": opp_loc, "num_blank": num_blank, "terminal": terminal,
+            "player_is_mover": player == game.active_player}
+
+
+# Knight move bitmasks used by the endgame solver, keyed by the board
+# (width, height)
+_knight_mask_tables = {}
+
+
+def _knight_masks(game):
+    """Return a tuple holding, for each cell index of `game`, the bitmask of
+    the cells a knight move away.
+    """
+    width, height = game.width, game.height
+    masks = _knight_mask_tables.get((width, height))
+    if masks is None:
+        masks = tuple(sum(1 << i for i in neighbors)
+                      for neighbors in game.neighbor_table(width, height))
+        _knight_mask_tables[(width, height)] = masks
+    return masks
+
+
+def _open_mask(game):
+    """Return the bitmask of the blank cells of `game`. """
+    height = game.height
+    mask = 0
+    for r, c in game.get_blank_spaces():
+        mask |= 1 << (r + c * height)
+    return mask
+
+
+def _reachable(start, open_mask, masks):
+    """Return the bitmask of the open cells that a knight at cell `start`
+    can reach through any sequence of moves over open cells.
+    """
+    region = 0
+    frontier = masks[start] & open_mask
+    while frontier:
+        region |= frontier
+        expanded = 0
+        while frontier:
+            bit = frontier & -frontier
+            expanded |= masks[bit.bit_length() - 1]
+            frontier ^= bit
+        frontier = expanded & open_mask & ~region
+    return region
+
+
+def _with_terminal(values, features):
+    """Replace the values of won and lost children by +inf and -inf. """
+    terminal = features["terminal"]
+    values = np.where(terminal > 0, float("inf"), values)
+    values = np.where(terminal < 0, float("-inf"), values)
+    return values.tolist()
+
+
+def batch_custom_score(game, player, moves):
+    """Return `[custom_score(game.forecast_move(m), player) for m in moves]`
+    computed with vectorized NumPy operations over all children at once.
+    """
+    f = _child_features(game, player, moves)
+    y1, x1 = f["own_loc"]
+    y2, x2 = f["opp_loc"]
+    y2_mirror, x2_mirror = game.height - y2 - 1, game.width - x2 - 1
+    distance = np.sqrt((y2_mirror - y1)**2 + (x2_mirror - x1)**2)
+    distance_weight = f["num_blank"] / (game.height * game.width)
+    values = (f["own"] - f["opp"]) - distance_weight * distance
+    return _with_terminal(values.astype(float), f)
+
+
+def batch_custom_score_2(game, player, moves):
+    """Return `[custom_score_2(game.forecast_move(m), player) for m in moves]`
+    computed with vectorized NumPy operations over all children at once.
+    """
+    f = _child_features(game, player, moves)
+    y1, x1 = f["own_loc"]
+    y2, x2 = f["opp_loc"]
+    distance = np.sqrt((y2 - y1)**2 + (x2 - x1)**2)
+    distance_offset = math.sqrt(2**2 + 1**2)
+    distance_weight = f["num_blank"] / (game.height * game.width)
+    values = (f["own"] - f["opp"]) - distance_weight * np.abs(distance - distance_offset)
+    return _with_terminal(values.astype(float), f)
+
+
+def batch_custom_score_3(game, player, moves):
+    """Return `[custom_score_3(game.forecast_move(m), player) for m in moves]`
+    computed with vectorized NumPy operations over all children at once.
+    """
+    f = _child_features(game, player, moves)
+    own = f["own"]
+    if f["player_is_mover"]:
+        # The mover is the inactive player in every child
+        own = own - f["overlap"]
+    return _with_terminal((own - f["opp"]).astype(float), f)
+
+
+def batch_improved_score(game, player, moves):
+    """Return the `sample_players.improved_score` of every child of `game`
+    reached by one of `moves`, computed with vectorized NumPy operations.
+    """
+    f = _child_features(game, player, moves)
+    return _with_terminal((f["own"] - f["opp"]).astype(float), f)
+
+
+class TranspositionTable:
+    """Fixed-size table of search results keyed by the Zobrist hash of the
+    position, so that positions reached through different move orders (and
+    again on the next iterative deepening pass) are not searched twice.
+
+    Each slot holds a single entry `(key, depth, bound, value, move,
+    generation)`. A new entry replaces the one in its slot when the old entry
+    was stored for the same position, during an earlier search, or at a
+    depth that is no greater than the new one.
+
+    The fields of the entries are kept in preallocated flat arrays, so that
+    storing an entry allocates no Python objects: a table of tuples gives
+    the garbage collector every entry to traverse, and its full collections
+    can pause a search for longer than `TIMER_THRESHOLD`.
+
+    Parameters
+    ----------
+    max_entries : int (optional)
+        The number of slots in the table, which caps its memory use (each
+        entry takes about 35 bytes).
+    """
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+    def __init__(self, max_entries=2**16):
+        self.max_entries = max_entries
+        self.generation = 0
+        self.clear()
+
+    def new_search(self):
+        """Age the current entries so they are replaced first. """
+        self.generation += 1
+
+    def clear(self):
+        n = self.max_entries
+        self._keys = array("Q", bytes(8 * n))
+        self._depths = array("h", [-1]) * n  # -1 marks an empty slot
+        self._bounds = array("b", bytes(n))
+        self._values = array("d", bytes(8 * n))
+        self._moves = array("l", [0]) * n
+        self._generations = array("L", [0]) * n
+
+    def __getstate__(self):
+        # Entries are only useful to the search that stored them, so the
+        # table is sent to other processes (e.g., tournament workers) empty
+        return {"max_entries": self.max_entries, "generation": self.generation}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.clear()
+
+    def lookup(self, key):
+        """Return the entry stored for `key`, or None. """
+        idx = key % self.max_entries
+        depth = self._depths[idx]
+        if depth < 0 or self._keys[idx] != key:
+            return None
+        move = self._moves[idx]
+        return (key, depth, self._bounds[idx], self._values[idx],
+                None if move < 0 else (move >> 16, move & 0xffff),
+                self._generations[idx])
+
+    def store(self, key, depth, bound, value, move):
+        """Record the result of searching the position `key` to `depth`. """
+        idx = key % self.max_entries
+        old_depth = self._depths[idx]
+        if (old_depth < 0 or self._keys[idx] == key or
+                self._generations[idx] != self.generation or old_depth <= depth):
+            self._keys[idx] = key
+            self._depths[idx] = depth
+            self._bounds[idx] = bound
+            self._values[idx] = value
+            self._moves[idx] = -1 if move is None else move[0] << 16 | move[1]
+            self._generations[idx] = self.generation
+
+
+class MoveOrderer:
+    """Order the moves searched at each node so that alpha-beta tries the
+    moves most likely to cause a cutoff first: the best move stored in the
+    transposition table by the previous iteration, then the killer moves
+    that caused cutoffs at the same ply, then all other moves by their
+    history score.
+
+    Any object with the same `new_search()`, `order()` and `record_cutoff()`
+    methods can be assigned to `AlphaBetaPlayer.move_orderer` instead.
+
+    Parameters
+    ----------
+    num_killers : int (optional)
+        The number of killer moves remembered for each ply.
+    """
+    def __init__(self, num_killers=2):
+        self.num_killers = num_killers
+        self.killers = {}
+        self.history = {}
+
+    def new_search(self):
+        """Forget the killer moves and decay the history scores before
+        searching a new root position.
+        """
+        self.killers = {}
+        self.history = {m: v // 2 for m, v in self.history.items() if v > 1}
+
+    def order(self, moves, ply, tt_move=None):
+        """Return the moves sorted from most to least promising. """
+        killers = self.killers.get(ply, ())
+        history = self.history
+
+        # History scores stay far below the priorities of the special moves
+        def priority(m):
+            if m == tt_move:
+                return 1 << 62
+            if m in killers:
+                return (1 << 61) - killers.index(m)
+            return history.get(m, 0)
+
+        return sorted(moves, key=priority, reverse=True)
+
+    def record_cutoff(self, move, ply, depth):
+        """Credit `move` with causing a cutoff at `ply` with `depth` plies
+        left to search.
+        """
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.num_killers:]
+        self.history[move] = self.history.get(move, 0) + depth * depth
+
+
+MoveStats = namedtuple("MoveStats", ["depth", "nodes", "cutoffs_by_ply",
+                                     "score_seconds", "movegen_seconds",
+                                     "seconds", "margin"])
+MoveStats.__doc__ = """Statistics of the search for one move.
+
+depth : the deepest search completed (0 if none completed, or if the move
+    came from the endgame solver)
+nodes : the number of nodes searched
+cutoffs_by_ply : the number of alpha-beta cutoffs at each ply below the root
+score_seconds : the time spent in the heuristic
+movegen_seconds : the time spent generating and counting legal moves outside
+    the heuristic
+seconds : the total time spent in get_move()
+margin : the milliseconds left on the clock when get_move() returned
+"""
+
+
+class SearchStats:
+    """Collect a `MoveStats` record for every move chosen by the
+    `IsolationPlayer` it is assigned to as `player.stats`.
+
+    While a move is searched, the heuristic, the legal move generation of
+    the searched board and the cutoff bookkeeping of the player are wrapped
+    with timers and counters. They are restored when get_move() returns, so
+    players without a collector (the default) pay nothing.
+
+    Parameters
+    ----------
+    callback : callable (optional)
+        A function `callback(player, move_stats)` called after every move.
+        Leave it unset on players sent to other processes, since it has to
+        be pickled with the player.
+
+    Attributes
+    ----------
+    moves : list of MoveStats
+        The statistics of every move, in the order they were played.
+    """
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.moves = []
+        self.active = False
+        self.heuristics = None
+        self._in_score = False
+        self._score_seconds = 0.
+        self._movegen_seconds = 0.
+        self._cutoffs_by_ply = []
+
+    def begin(self, player):
+        """Start collecting the statistics of a move of `player`. """
+        self.active = True
+        self._score_seconds = 0.
+        self._movegen_seconds = 0.
+        self._cutoffs_by_ply = []
+        self.heuristics = (player.score, player.batch_score_fn)
+        player.score = self._timed_score(player.score)
+        if player.batch_score_fn is not None:
+            player.batch_score_fn = self._timed_score(player.batch_score_fn)
+        if hasattr(player, "_record_cutoff"):
+            player._record_cutoff = self._counted_cutoff(player._record_cutoff)
+
+    def end(self, player, seconds, margin):
+        """Restore `player` and record the statistics of its move. """
+        player.score, player.batch_score_fn = self.heuristics
+        if "_record_cutoff" in player.__dict__:
+            del player._record_cutoff
+        self.active = False
+        self.heuristics = None
+        move_stats = MoveStats(player.depth_reached, player.nodes_searched,
+                               tuple(self._cutoffs_by_ply), self._score_seconds,
+                               self._movegen_seconds, seconds, margin)
+        self.moves.append(move_stats)
+        if self.callback is not None:
+            self.callback(player, move_stats)
+
+    def instrument(self, game):
+        """Time the legal move generation of `game`, a private copy of the
+        board searched for the current move.
+        """
+        for name in ("get_legal_moves", "get_legal_move_indexes",
+                     "count_legal_moves"):
+            setattr(game, name, self._timed_movegen(getattr(game, name)))
+
+    def _timed_score(self, score_fn):
+        def timed(*args):
+            self._in_score = True
+            start = time.perf_counter()
+            try:
+                return score_fn(*args)
+            finally:
+                self._score_seconds += time.perf_counter() - start
+                self._in_score = False
+        return timed
+
+    def _timed_movegen(self, movegen):
+        def timed(*args):
+            # Move generation inside the heuristic is part of its time
+            if self._in_score:
+                return movegen(*args)
+            start = time.perf_counter()
+            try:
+                return movegen(*args)
+            finally:
+                self._movegen_seconds += time.perf_counter() - start
+        return timed
+
+    def _counted_cutoff(self, record_cutoff):
+        counts = self._cutoffs_by_ply
+
+        def counted(move, ply, depth):
+            while len(counts) <= ply:
+                counts.append(0)
+            counts[ply] += 1
+            record_cutoff(move, ply, depth)
+        return counted
+
+    def summary(self):
+        """Return a dict aggregating the statistics of all moves, or None if
+        no move was recorded.
+        """
+        if not self.moves:
+            return None
+        count = len(self.moves)
+        cutoffs_by_ply = []
+        for move_stats in self.moves:
+            for ply, cutoffs in enumerate(move_stats.cutoffs_by_ply):
+                if ply == len(cutoffs_by_ply):
+                    cutoffs_by_ply.append(0)
+                cutoffs_by_ply[ply] += cutoffs
+        seconds = sum(m.seconds for m in self.moves) or 1.
+        return {
+            "moves": count,
+            "mean_depth": sum(m.depth for m in self.moves) / count,
+            "max_depth": max(m.depth for m in self.moves),
+            "mean_nodes": sum(m.nodes for m in self.moves) / count,
+            "cutoffs_by_ply": cutoffs_by_ply,
+            "score_fraction": sum(m.score_seconds for m in self.moves) / seconds,
+            "movegen_fraction": sum(m.movegen_seconds for m in self.moves) / seconds,
+            "mean_margin": sum(m.margin for m in self.moves) / count,
+            "min_margin": min(m.margin for m in self.moves),
+        }
+
+
+def _collect_stats(get_move):
+    """Decorate the get_move() method of an `IsolationPlayer` to record the
+    statistics of each move in `player.stats` when it is set.
+    """
+    @functools.wraps(get_move)
+    def wrapper(self, game, time_left):
+        stats = self.stats
+        # Calls from an overriding get_move() are part of the same move
+        if stats is None or stats.active:
+            return get_move(self, game, time_left)
+        stats.begin(self)
+        start = time.perf_counter()
+        try:
+            return get_move(self, game, time_left)
+        finally:
+            stats.end(self, time.perf_counter() - start, time_left())
+    return wrapper
+
+
 class IsolationPlayer:
     """Base class for minimax and alphabeta agents -- this class is never
     constructed or tested directly.
@@ -162,12 +701,128 @@ class IsolationPlayer:
         Time remaining (in milliseconds) when search is aborted. Should be a
         positive value large enough to allow the function to return before the
         timer expires.
+
+    batch_score_fn : callable (optional)
+        A function `batch_score_fn(game, player, moves)` returning the value
+        of `score_fn` for the child of `game` reached by each of `moves`
+        (e.g., `batch_custom_score` for `custom_score`). When given, nodes
+        one ply above the search horizon score all their children in one
+        call instead of one call per leaf.
+
+    Attributes
+    ----------
+    nodes_searched : int
+        The number of nodes visited by the search for the current move.
+
+    cutoffs : int
+        The number of alpha-beta cutoffs in the search for the current move.
+
+    depth_reached : int
+        The deepest search completed for the current move.
+
+    stats : SearchStats or None
+        Set to a `SearchStats` to collect the statistics of every move.
     """
-    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.):
+    # The clock is read only every few nodes. The interval is set from the
+    # measured search speed so that the nodes between two readings take at
+    # most this fraction of TIMER_THRESHOLD
+    CHECK_FRACTION = 0.1
+
+    # Most nodes searched between two readings of the clock
+    MAX_CHECK_INTERVAL = 1024
+
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 batch_score_fn=None):
         self.search_depth = search_depth
         self.score = score_fn
+        self.batch_score_fn = batch_score_fn
         self.time_left = None
         self.TIMER_THRESHOLD = timeout
+        self.stats = None
+
+        # Search counters, reset at the start of every call to get_move()
+        self.nodes_searched = 0
+        self.cutoffs = 0
+        self.depth_reached = 0
+        self.reset_clock()
+
+    def __getstate__(self):
+        # The clock of the last move is a function local to Board.play(),
+        # which cannot be pickled to send the player to a worker process
+        state = self.__dict__.copy()
+        state["time_left"] = None
+        return state
+
+    def reset_clock(self):
+        """Read the clock at the next searched node. Called whenever the
+        search starts with a new `time_left` or resets `nodes_searched`.
+        """
+        self._next_check = self.nodes_searched
+        self._check_interval = 1
+        self._last_check = None
+
+    def check_time(self):
+        """Raise `SearchTimeout` if less than TIMER_THRESHOLD milliseconds
+        are left, and schedule the next reading of the clock.
+
+        The search speed is measured between consecutive readings. The next
+        reading is scheduled after the number of nodes searched at that speed
+        in CHECK_FRACTION of TIMER_THRESHOLD, or in half of the time left
+        before the threshold if that is shorter, so the search stops within
+        a small fraction of TIMER_THRESHOLD of the deadline.
+        """
+        remaining = self.time_left()
+        if remaining < self.TIMER_THRESHOLD:
+            raise SearchTimeout()
+
+        interval = 2 * self._check_interval
+        if self._last_check is not None:
+            nodes, last_remaining = self._last_check
+            elapsed = last_remaining - remaining
+            if elapsed > 0:
+                window = min(self.CHECK_FRACTION * self.TIMER_THRESHOLD,
+                             (remaining - self.TIMER_THRESHOLD) / 2)
+                interval = int((self.nodes_searched - nodes) * window / elapsed)
+        self._check_interval = max(1, min(interval, self.MAX_CHECK_INTERVAL))
+        self._next_check = self.nodes_searched + self._check_interval
+        self._last_check = (self.nodes_searched, remaining)
+
+    def score_children(self, game, player):
+        """Return the legal moves of the active player and the scores of the
+        children they lead to, evaluated in one batch with `batch_score_fn`.
+        The children count as searched nodes.
+        """
+        moves = game.get_legal_moves()
+        self.nodes_searched += len(moves)
+        return moves, self.batch_score_fn(game, player, moves)
+
+    def first_move(self, game):
+        """Return the open cell closest to the center of the board if this
+        player has not moved yet in `game`, or None otherwise.
+
+        Any open cell is a legal first move, so searching it would spend the
+        turn on the first ply on large boards, and the heuristics need both
+        players on the board. Before a player's first move at most the
+        opponent's cell is blocked, so this takes constant time.
+        """
+        if game.get_player_index(self) is not None:
+            return None
+        row, col = game.height // 2, game.width // 2
+        for dr, dc in ((0, 0), (-1, 0), (0, -1), (1, 0), (0, 1),
+                       (-1, -1), (-1, 1), (1, -1), (1, 1)):
+            if game.move_is_legal((row + dr, col + dc)):
+                return (row + dr, col + dc)
+        blank_spaces = game.get_blank_spaces()
+        return blank_spaces[0] if blank_spaces else (-1, -1)
+
+    def _search_copy(self, game):
+        """Return a private copy of `game` for the search, which applies and
+        takes back moves in-place and may be left mid-search by a timeout.
+        """
+        game = game.copy()
+        if self.stats is not None:
+            self.stats.instrument(game)
+        return game
         
 
 class MinimaxPlayer(IsolationPlayer):
@@ -175,6 +830,7 @@ class MinimaxPlayer(IsolationPlayer):
     search. You must finish and test this player to make sure it properly uses
     minimax to return a good move before the search time limit expires.
     """
+    @_collect_stats
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
         result before the time limit expires.
@@ -204,6 +860,14 @@ class MinimaxPlayer(IsolationPlayer):
             (-1, -1) if there are no available legal moves.
         """
         self.time_left = time_left
+        self.nodes_searched = 0
+        self.cutoffs = 0
+        self.depth_reached = 0
+        self.reset_clock()
+
+        move = self.first_move(game)
+        if move is not None:
+            return move
 
         # Initialize the best move so that this function returns something
         # in case the search fails due to timeout
@@ -212,7 +876,8 @@ class MinimaxPlayer(IsolationPlayer):
         try:
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
-            return self.minimax(game, self.search_depth)
+            best_move = self.minimax(self._search_copy(game), self.search_depth)
+            self.depth_reached = self.search_depth
 
         except SearchTimeout:
             pass  # Handle any actions required after timeout as needed
@@ -259,47 +924,65 @@ class MinimaxPlayer(IsolationPlayer):
                 each helper function or else your agent will timeout during
                 testing.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.nodes_searched += 1
+        if self.nodes_searched >= self._next_check:
+            self.check_time()
 
         # TODO: finish this function!
+        legal_moves = game.get_legal_moves()
         best_score = float("-inf")
-        best_move = (-1, -1)
-        for m in game.get_legal_moves():
-            v = self.min_value(game.forecast_move(m), depth - 1, self)
+        # Fall back to any legal move when every move loses, rather than
+        # forfeiting with (-1, -1) while legal moves remain
+        best_move = legal_moves[0] if legal_moves else (-1, -1)
+        for m in legal_moves:
+            game.push_move(m)
+            v = self.min_value(game, depth - 1, self)
+            game.pop_move()
             if v > best_score:
                 best_score = v
                 best_move = m
         return best_move
         
     def min_value(self, game, depth, player):
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.nodes_searched += 1
+        if self.nodes_searched >= self._next_check:
+            self.check_time()
         
         if depth == 0 or self.terminal_state(game):
             return self.score(game, player)
+
+        if depth == 1 and self.batch_score_fn is not None:
+            return min(self.score_children(game, player)[1])
         
         v = float("inf")
         for m in game.get_legal_moves():
-            v = min(v, self.max_value(game.forecast_move(m), depth - 1, player))
+            game.push_move(m)
+            v = min(v, self.max_value(game, depth - 1, player))
+            game.pop_move()
                     
         return v
     
     def max_value(self, game, depth, player):
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.nodes_searched += 1
+        if self.nodes_searched >= self._next_check:
+            self.check_time()
             
         if depth == 0 or self.terminal_state(game):
             return self.score(game, player)
+
+        if depth == 1 and self.batch_score_fn is not None:
+            return max(self.score_children(game, player)[1])
         
         v = float("-inf")
         for m in game.get_legal_moves():
-            v = max(v, self.min_value(game.forecast_move(m), depth - 1, player))
+            game.push_move(m)
+            v = max(v, self.min_value(game, depth - 1, player))
+            game.pop_move()
         
         return v
 
     def terminal_state(self, game):
-        moves_are_available = bool(game.get_legal_moves())
+        moves_are_available = bool(game.count_legal_moves())
         return not moves_are_available
 
 
@@ -307,8 +990,69 @@ class AlphaBetaPlayer(IsolationPlayer):
     """Game-playing agent that chooses a move using iterative deepening minimax
     search with alpha-beta pruning. You must finish and test this player to
     make sure it returns a good move before the search time limit expires.
-    """
 
+    Parameters
+    ----------
+    tt_size : int (optional)
+        The number of entries in the transposition table kept between moves
+        and iterative deepening passes. Set to 0 to disable the table.
+
+    move_ordering : bool (optional)
+        Search the moves at each node in the order given by a `MoveOrderer`
+        rather than in the order returned by the board.
+
+    endgame_solver : bool (optional)
+        Once the cells reachable by the two players no longer overlap, play
+        the longest open knight path exactly instead of searching the game
+        tree, since the players can no longer affect each other.
+
+    aspiration_window : float or None (optional)
+        Start every iterative deepening pass after the first with the window
+        (score - aspiration_window, score + aspiration_window) around the
+        score of the previous pass, and widen it to infinity on the side the
+        search fails. Set to None to always search with an infinite window.
+
+    See `IsolationPlayer` for the remaining parameters.
+
+    Attributes
+    ----------
+    pvs_researches : int
+        The number of moves searched again with the full window after a null
+        window search showed that they improve on the best move so far.
+
+    aspiration_researches : int
+        The number of passes searched again because the score fell outside
+        the aspiration window.
+
+    root_score : float or None
+        The score of the best move found by the last completed call to
+        alphabeta(), which is only exact if it lies inside the window of the
+        call.
+    """
+    # Most longest-path results remembered by the endgame solver
+    MAX_PATH_MEMO = 2**20
+
+    # Mixed into the transposition table keys when this player moves second,
+    # because stored values are scored from the searching player's view
+    PLAYER_2_KEY = 0x9e3779b97f4a7c15
+
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 batch_score_fn=None, tt_size=2**16, move_ordering=True,
+                 endgame_solver=True, aspiration_window=2.):
+        super().__init__(search_depth, score_fn, timeout, batch_score_fn)
+        self.tt = TranspositionTable(tt_size) if tt_size else None
+        self.move_orderer = MoveOrderer() if move_ordering else None
+        self.endgame_solver = endgame_solver
+        self.aspiration_window = aspiration_window
+        self.pvs_researches = 0
+        self.aspiration_researches = 0
+        self._tt_salt = 0
+        self._root_depth = 0
+        self.root_score = None
+        self._path_memo = {}
+        self._path_masks = None
+
+    @_collect_stats
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
         result before the time limit expires.
@@ -340,16 +1084,40 @@ class AlphaBetaPlayer(IsolationPlayer):
             (-1, -1) if there are no available legal moves.
         """
         self.time_left = time_left
+        self.nodes_searched = 0
+        self.cutoffs = 0
+        self.depth_reached = 0
+        self.pvs_researches = 0
+        self.aspiration_researches = 0
+        self.root_score = None
+        self.reset_clock()
 
         # TODO: finish this function!
         best_move = (-1, -1)
-        
+
+        move = self.first_move(game)
+        if move is not None:
+            return move
+
+        if self.endgame_solver:
+            move = self.endgame_move(game)
+            if move is not None:
+                return move
+
+        game = self._search_copy(game)
+        if self.tt is not None:
+            self.tt.new_search()
+        if self.move_orderer is not None:
+            self.move_orderer.new_search()
         try:
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
             depth = 1
             while True:
-                best_move = self.alphabeta(game, depth)
+                best_move = self.aspiration_search(game, depth, self.root_score)
+                # Passes deeper than the number of open cells search the
+                # same, complete game tree
+                self.depth_reached = min(depth, game.count_blank_spaces())
                 depth += 1
         except SearchTimeout:
             pass  # Handle any actions required after timeout as needed
@@ -357,6 +1125,102 @@ class AlphaBetaPlayer(IsolationPlayer):
         # Return the best move from the last completed search iteration
         return best_move
 
+    def endgame_move(self, game):
+        """Return the first move of the longest open path for this player if
+        the board is partitioned, i.e., no cell is reachable by both players,
+        or None if the players can still interfere with each other.
+
+        The moves are solved in order of the number of moves they leave open
+        in the region. If the time runs out before the solver finishes, the
+        start of the longest path found so far is returned, or the move
+        leaving the most moves open if no move was solved.
+        """
+        own_loc = game.get_player_index(self)
+        opp_loc = game.get_player_index(game.get_opponent(self))
+        if own_loc is None or opp_loc is None:
+            return None
+
+        height = game.height
+        masks = _knight_masks(game)
+        open_mask = _open_mask(game)
+        own_region = _reachable(own_loc, open_mask, masks)
+        opp_region = _reachable(opp_loc, open_mask, masks)
+        if own_region & opp_region:
+            return None
+
+        legal_moves = game.get_legal_moves()
+        if not legal_moves:
+            return (-1, -1)
+        # Cell indexes depend on the board size, so paths memoized on a
+        # board of another size (i.e., other knight masks) are dropped
+        if len(self._path_memo) > self.MAX_PATH_MEMO or masks is not self._path_masks:
+            self._path_memo = {}
+            self._path_masks = masks
+
+        def onward_moves(move):
+            idx = move[0] + move[1] * height
+            return bin(masks[idx] & own_region & ~(1 << idx)).count("1")
+
+        legal_moves = sorted(legal_moves, key=onward_moves, reverse=True)
+        region_size = bin(own_region).count("1")
+        best_move, best_length = legal_moves[0], 0
+        try:
+            for move in legal_moves:
+                idx = move[0] + move[1] * height
+                length = 1 + self.longest_path(idx, own_region & ~(1 << idx), masks)
+                if length > best_length:
+                    best_move, best_length = move, length
+                    if best_length == region_size:
+                        break
+        except SearchTimeout:
+            pass
+        return best_move
+
+    def longest_path(self, loc, open_mask, masks):
+        """Return the number of moves in the longest knight path from cell
+        `loc` over the cells of `open_mask`, memoized by (loc, open_mask)
+        for the knight `masks` of the last `endgame_move()`.
+        """
+        key = (loc, open_mask)
+        length = self._path_memo.get(key)
+        if length is not None:
+            return length
+        self.nodes_searched += 1
+        if self.nodes_searched >= self._next_check:
+            self.check_time()
+
+        length = 0
+        upper_bound = bin(open_mask).count("1")
+        moves = masks[loc] & open_mask
+        while moves and length < upper_bound:
+            bit = moves & -moves
+            moves ^= bit
+            length = max(length, 1 + self.longest_path(bit.bit_length() - 1,
+                                                       open_mask ^ bit, masks))
+        self._path_memo[key] = length
+        return length
+
+    def aspiration_search(self, game, depth, guess):
+        """Search to `depth` with a narrow window around `guess`, the score
+        expected from the previous pass, and return the best move. If the
+        score falls outside the window, the failing side of the window is
+        opened and the position is searched again.
+        """
+        if (self.aspiration_window is None or guess is None or
+                math.isinf(guess)):
+            return self.alphabeta(game, depth)
+        alpha = guess - self.aspiration_window
+        beta = guess + self.aspiration_window
+        while True:
+            move = self.alphabeta(game, depth, alpha, beta)
+            if self.root_score <= alpha and alpha != float("-inf"):
+                alpha = float("-inf")
+            elif self.root_score >= beta and beta != float("inf"):
+                beta = float("inf")
+            else:
+                return move
+            self.aspiration_researches += 1
+
     def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf")):
         """Implement depth-limited minimax search with alpha-beta pruning as
         described in the lectures.
@@ -402,50 +1266,388 @@ class AlphaBetaPlayer(IsolationPlayer):
                 each helper function or else your agent will timeout during
                 testing.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.nodes_searched += 1
+        if self.nodes_searched >= self._next_check:
+            self.check_time()
 
         # TODO: finish this function!
+        # The player to move at the root is the searching player, and player
+        # 1 always moves on even move counts
+        self._tt_salt = self.PLAYER_2_KEY if game.move_count % 2 else 0
+        self._root_depth = depth
+        alpha_orig = alpha
+
+        legal_moves = self._ordered_moves(game, 0)
+        best_score, best_move = self._search_root(game, depth, legal_moves,
+                                                  alpha, beta)
+        self.root_score = best_score
+
+        if self.tt is not None and legal_moves:
+            self.tt.store(game.hash() ^ self._tt_salt, depth,
+                          self._bound(best_score, alpha_orig, beta),
+                          best_score, best_move)
+        return best_move
+    
+    def search_root_moves(self, game, depth, moves):
+        """Search only `moves` of the active player in `game` to `depth` plies
+        and return (score, move) for the best of them. Unlike alphabeta(), the
+        result is not stored in the transposition table, since it does not
+        cover every root move.
+        """
+        self.nodes_searched += 1
+        if self.nodes_searched >= self._next_check:
+            self.check_time()
+
+        self._tt_salt = self.PLAYER_2_KEY if game.move_count % 2 else 0
+        self._root_depth = depth
+        if self.move_orderer is not None:
+            moves = self.move_orderer.order(moves, 0)
+        return self._search_root(game, depth, moves, float("-inf"), float("inf"))
+
+    def _search_root(self, game, depth, moves, alpha, beta):
+        """Return (score, move) for the best of `moves` at the root. A score
+        at or above beta ends the search early, as in max_value().
+        """
         best_score = float("-inf")
-        best_move = (-1, -1)
-        for m in game.get_legal_moves():
-            v = self.min_value(game.forecast_move(m), depth - 1, self, alpha, beta)
+        best_move = moves[0] if moves else (-1, -1)
+        for m in moves:
+            game.push_move(m)
+            v = self._search_min_child(game, depth - 1, self, alpha, beta,
+                                       m is not moves[0])
+            game.pop_move()
             if v > best_score:
                 best_score = v
                 best_move = m
+            if v >= beta:
+                break
             alpha = max(alpha, v)
-        return best_move
-    
+        return best_score, best_move
+
+    def _search_min_child(self, game, depth, player, alpha, beta, null_window):
+        """Return the value of `game`, a minimizing child of a maximizing
+        node, with the principal variation search. With `null_window`, the
+        child is first searched with the smallest window above alpha, which
+        only tells whether it improves on alpha, and searched again with the
+        full window if it does.
+        """
+        if not null_window or alpha == float("-inf"):
+            return self.min_value(game, depth, player, alpha, beta)
+        v = self.min_value(game, depth, player, alpha, _next_float(alpha, float("inf")))
+        if alpha < v < beta:
+            self.pvs_researches += 1
+            v = self.min_value(game, depth, player, alpha, beta)
+        return v
+
+    def _search_max_child(self, game, depth, player, alpha, beta, null_window):
+        """Return the value of `game`, a maximizing child of a minimizing
+        node, with the principal variation search, using the smallest window
+        below beta for the first search. See `_search_min_child()`.
+        """
+        if not null_window or beta == float("inf"):
+            return self.max_value(game, depth, player, alpha, beta)
+        v = self.max_value(game, depth, player, _next_float(beta, float("-inf")), beta)
+        if alpha < v < beta:
+            self.pvs_researches += 1
+            v = self.max_value(game, depth, player, alpha, beta)
+        return v
+
     def max_value(self, game, depth, player, alpha, beta):
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.nodes_searched += 1
+        if self.nodes_searched >= self._next_check:
+            self.check_time()
             
         if self.terminal_state(game) or depth == 0:
             return self.score(game, player)
+
+        tt = self.tt
+        entry = None
+        if tt is not None:
+            key = game.hash() ^ self._tt_salt
+            entry = tt.lookup(key)
+            if entry is not None and self._tt_cutoff(entry, depth, alpha, beta):
+                return entry[3]
+        alpha_orig = alpha
+        ply = self._root_depth - depth
         
         v = float("-inf")
-        for m in game.get_legal_moves():
-            v = max(v, self.min_value(game.forecast_move(m), depth - 1, player, alpha, beta))
+        best_move = None
+        if depth == 1 and self.batch_score_fn is not None:
+            moves, values = self.score_children(game, player)
+            v = max(values)
+            best_move = moves[values.index(v)]
             if v >= beta:
-                return v
-            alpha = max(alpha, v)
+                self._record_cutoff(best_move, ply, depth)
+        else:
+            for m in self._ordered_moves(game, ply, entry):
+                game.push_move(m)
+                child_v = self._search_min_child(game, depth - 1, player, alpha,
+                                                 beta, best_move is not None)
+                game.pop_move()
+                if child_v > v or best_move is None:
+                    v = child_v
+                    best_move = m
+                if v >= beta:
+                    self._record_cutoff(m, ply, depth)
+                    break
+                alpha = max(alpha, v)
+
+        if tt is not None:
+            tt.store(key, depth, self._bound(v, alpha_orig, beta), v, best_move)
         return v
     
     def min_value(self, game, depth, player, alpha, beta):
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.nodes_searched += 1
+        if self.nodes_searched >= self._next_check:
+            self.check_time()
         
         if self.terminal_state(game) or depth == 0:
             return self.score(game, player)
+
+        tt = self.tt
+        entry = None
+        if tt is not None:
+            key = game.hash() ^ self._tt_salt
+            entry = tt.lookup(key)
+            if entry is not None and self._tt_cutoff(entry, depth, alpha, beta):
+                return entry[3]
+        beta_orig = beta
+        ply = self._root_depth - depth
         
         v = float("inf")
-        for m in game.get_legal_moves():
-            v = min(v, self.max_value(game.forecast_move(m), depth - 1, player, alpha, beta))
+        best_move = None
+        if depth == 1 and self.batch_score_fn is not None:
+            moves, values = self.score_children(game, player)
+            v = min(values)
+            best_move = moves[values.index(v)]
             if v <= alpha:
-                return v
-            beta = min(beta, v)
+                self._record_cutoff(best_move, ply, depth)
+        else:
+            for m in self._ordered_moves(game, ply, entry):
+                game.push_move(m)
+                child_v = self._search_max_child(game, depth - 1, player, alpha,
+                                                 beta, best_move is not None)
+                game.pop_move()
+                if child_v < v or best_move is None:
+                    v = child_v
+                    best_move = m
+                if v <= alpha:
+                    self._record_cutoff(m, ply, depth)
+                    break
+                beta = min(beta, v)
+
+        if tt is not None:
+            tt.store(key, depth, self._bound(v, alpha, beta_orig), v, best_move)
         return v
+
+    def _record_cutoff(self, move, ply, depth):
+        self.cutoffs += 1
+        if self.move_orderer is not None:
+            self.move_orderer.record_cutoff(move, ply, depth)
+
+    def _ordered_moves(self, game, ply, entry=None):
+        """Return the legal moves of the active player in the order they
+        should be searched. The root passes no entry, so it is looked up here.
+        """
+        moves = game.get_legal_moves()
+        if self.move_orderer is None:
+            return moves
+        if entry is None and ply == 0 and self.tt is not None:
+            entry = self.tt.lookup(game.hash() ^ self._tt_salt)
+        tt_move = entry[4] if entry is not None else None
+        return self.move_orderer.order(moves, ply, tt_move)
+
+    @staticmethod
+    def _bound(v, alpha, beta):
+        """Classify a search result against the window it was searched with. """
+        if v <= alpha:
+            return TranspositionTable.UPPER
+        if v >= beta:
+            return TranspositionTable.LOWER
+        return TranspositionTable.EXACT
+
+    @staticmethod
+    def _tt_cutoff(entry, depth, alpha, beta):
+        """Test whether a stored entry settles the value of a node searched to
+        `depth` within the window (alpha, beta).
+        """
+        _, entry_depth, bound, value, _, _ = entry
+        if entry_depth < depth:
+            return False
+        return (bound == TranspositionTable.EXACT or
+                (bound == TranspositionTable.LOWER and value >= beta) or
+                (bound == TranspositionTable.UPPER and value <= alpha))
     
     def terminal_state(self, game):
-        moves_are_available = bool(game.get_legal_moves())
+        moves_are_available = bool(game.count_legal_moves())
         return not moves_are_available
+
+
+# Searchers kept by each worker process of a ParallelAlphaBetaPlayer, keyed by
+# their settings, so their transposition tables and move ordering statistics
+# carry over from one move to the next
+_worker_searchers = {}
+
+
+def _replace_players(game, players):
+    """Return a copy of `game` in which every player that is a key of the
+    dict `players` is replaced by the corresponding value.
+    """
+    game = game.copy()
+    for name in ("_player_1", "_player_2", "_active_player", "_inactive_player"):
+        player = getattr(game, name)
+        setattr(game, name, players.get(player, player))
+    return game
+
+
+def _parallel_search_worker(task):
+    """Search a subset of the root moves of a position with iterative
+    deepening until the deadline or `max_depth`. Return a tuple (results,
+    nodes searched, cutoffs), where results maps each completed depth to the
+    (score, move) of the best move of the subset.
+    """
+    game, moves, deadline, max_depth, settings = task
+    searcher = _worker_searchers.get(settings)
+    if searcher is None:
+        searcher = AlphaBetaPlayer(*settings, endgame_solver=False)
+        _worker_searchers[settings] = searcher
+    # The deadline is a wall clock time, which is shared by all processes
+    searcher.time_left = lambda: 1000 * (deadline - time.time())
+    searcher.nodes_searched = 0
+    searcher.cutoffs = 0
+    searcher.reset_clock()
+    if searcher.tt is not None:
+        searcher.tt.new_search()
+    if searcher.move_orderer is not None:
+        searcher.move_orderer.new_search()
+
+    game = _replace_players(game, {"searcher": searcher})
+    results = {}
+    try:
+        depth = 1
+        while max_depth is None or depth <= max_depth:
+            results[depth] = searcher.search_root_moves(game, depth, moves)
+            depth += 1
+    except SearchTimeout:
+        pass
+    return results, searcher.nodes_searched, searcher.cutoffs
+
+
+class ParallelAlphaBetaPlayer(AlphaBetaPlayer):
+    """Game-playing agent that splits the root moves between a pool of worker
+    processes, each running its own iterative deepening alpha-beta search
+    over its share of the moves until the deadline.
+
+    The result of the deepest iteration completed by every worker is used,
+    so the chosen move is exactly the one a serial search to that depth
+    would choose. The workers cannot share alpha-beta bounds, so together
+    they search more nodes than a serial search to the same depth.
+
+    The worker pool is started on the first move and kept until close() is
+    called. Inside a daemonic process (e.g., a worker of the tournament
+    pool), which cannot start processes of its own, the player falls back to
+    the serial `AlphaBetaPlayer` search.
+
+    Parameters
+    ----------
+    workers : int (optional)
+        The number of worker processes. Defaults to the number of CPUs.
+
+    See `AlphaBetaPlayer` for the remaining parameters.
+    """
+    # Time (in milliseconds) reserved for sending the results of the workers
+    # back to the main process before the search deadline
+    IPC_MARGIN = 5.
+
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 batch_score_fn=None, tt_size=2**16, move_ordering=True,
+                 endgame_solver=True, workers=None):
+        super().__init__(search_depth, score_fn, timeout, batch_score_fn,
+                         tt_size, move_ordering, endgame_solver)
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state["_pool"] = None
+        return state
+
+    def start(self):
+        """Start the worker processes, if they are not running yet. """
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.workers)
+
+    def close(self):
+        """Shut down the worker processes. """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    @_collect_stats
+    def get_move(self, game, time_left):
+        """Search for the best move with the worker pool and return it before
+        the time limit expires. See `AlphaBetaPlayer.get_move()`.
+        """
+        if (self.workers < 2 or len(game.get_legal_moves()) < 2 or
+                multiprocessing.current_process().daemon):
+            return super().get_move(game, time_left)
+
+        self.time_left = time_left
+        self.nodes_searched = 0
+        self.cutoffs = 0
+        self.depth_reached = 0
+        self.reset_clock()
+        move = self.first_move(game)
+        if move is not None:
+            return move
+        if self.endgame_solver:
+            move = self.endgame_move(game)
+            if move is not None:
+                return move
+        return self.parallel_search(game)
+
+    def parallel_search(self, game, max_depth=None):
+        """Split the legal moves of the active player (this player) in `game`
+        between the workers, search them to `max_depth` plies or until the
+        deadline given by `self.time_left`, and return the best move of the
+        deepest iteration completed by every worker.
+        """
+        legal_moves = game.get_legal_moves()
+        if not legal_moves:
+            return (-1, -1)
+        self.start()
+
+        budget = self.time_left() - self.IPC_MARGIN
+        deadline = time.time() + budget / 1000
+        score_fn, batch_score_fn = self.score, self.batch_score_fn
+        if self.stats is not None and self.stats.active:
+            # Send the workers the heuristics rather than their timers
+            score_fn, batch_score_fn = self.stats.heuristics
+        settings = (self.search_depth, score_fn, self.TIMER_THRESHOLD,
+                    batch_score_fn, self.tt.max_entries if self.tt else 0,
+                    self.move_orderer is not None)
+        detached = _replace_players(game, {self: "searcher",
+                                           game.get_opponent(self): "opponent"})
+        pending = [self._pool.apply_async(_parallel_search_worker,
+                                          ((detached, legal_moves[i::self.workers],
+                                            deadline, max_depth, settings),))
+                   for i in range(min(self.workers, len(legal_moves)))]
+
+        results = []
+        for result in pending:
+            remaining = (self.time_left() - self.TIMER_THRESHOLD) / 1000
+            result.wait(None if remaining == float("inf") else max(remaining, 0))
+            if not result.ready():
+                continue
+            depth_results, nodes, cutoffs = result.get()
+            self.nodes_searched += nodes
+            self.cutoffs += cutoffs
+            if depth_results:
+                results.append(depth_results)
+
+        if not results:
+            return legal_moves[0]
+        depth = min(max(depth_results) for depth_results in results)
+        self.depth_reached = depth
+        return max((depth_results[depth] for depth_results in results),
+                   key=lambda result: result[0])[1]
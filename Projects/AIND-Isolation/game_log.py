@@ -0,0 +1,120 @@
+"""Record isolation games in a line-delimited JSON log.
+
+Each line of a log holds one game as a JSON object:
+
+    {"players": ["AB_Improved", "MM_Open"], "width": 7, "height": 7,
+     "seed": 1234, "time_limit": 150, "opening": [[3, 3], [0, 5]],
+     "moves": [[1, 2], [2, 3], ...], "times": [148.2, 149.0, ...],
+     "nodes": [1203, null, ...], "winner": 0, "termination": "illegal move"}
+
+"players" holds the names of player 1 and player 2. "opening" holds the moves
+applied before the game was played (e.g., the random openings of the
+tournament), and "moves" the moves the players returned afterwards, with
+the milliseconds each took in "times" and the nodes its search visited in
+"nodes" (null for agents that do not count nodes). The last move of a game
+lost by timeout or forfeit is included. "winner" is the index of the winner
+in "players".
+
+Logs are appended one line at a time, so a tournament can stream games to
+disk as they finish, and read back one game at a time.
+"""
+import json
+
+from isolation import Board
+
+
+class GameRecorder:
+    """Collect the moves of one game through the `on_move` callback of
+    `Board.play()` and build its log record.
+
+    Parameters
+    ----------
+    game : isolation.Board
+        The game about to be played.
+
+    names : dict
+        The name of each player of `game`, keyed by the player object.
+
+    opening : list (optional)
+        The moves already applied to `game`.
+
+    seed : int (optional)
+        The seed of the random module for the game.
+
+    time_limit : numeric (optional)
+        The number of milliseconds allowed for each move.
+    """
+
+    def __init__(self, game, names, opening=(), seed=None, time_limit=None):
+        self.players = [game.active_player, game.inactive_player]
+        if game.move_count % 2:
+            self.players.reverse()
+        self.record = {
+            "players": [names[player] for player in self.players],
+            "width": game.width,
+            "height": game.height,
+            "seed": seed,
+            "time_limit": time_limit,
+            "opening": [list(move) for move in opening],
+            "moves": [],
+            "times": [],
+            "nodes": [],
+        }
+
+    def on_move(self, player, move, elapsed):
+        self.record["moves"].append(list(move) if move else None)
+        self.record["times"].append(round(elapsed, 3))
+        self.record["nodes"].append(getattr(player, "nodes_searched", None))
+
+    def finish(self, winner, termination):
+        """Return the record of the game, given the winning player and the
+        reason the game ended.
+        """
+        self.record["winner"] = self.players.index(winner)
+        self.record["termination"] = termination
+        return self.record
+
+
+class GameLogWriter:
+    """Append game records to a log file, one line per game. Use as a
+    context manager, or call close() when done.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "a")
+
+    def write(self, record):
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_games(path):
+    """Yield the records of the games in a log file. """
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def replay_positions(record, player_1="Player1", player_2="Player2"):
+    """Replay a game record and yield (game, move) for every recorded move
+    that was legal, where `game` is a new `Board` in the position the move
+    was chosen in, played by `player_1` and `player_2`.
+    """
+    game = Board(player_1, player_2, record["width"], record["height"])
+    for move in record["opening"]:
+        game.apply_move(tuple(move))
+    for move in record["moves"]:
+        if move is None or tuple(move) not in game.get_legal_moves():
+            return
+        yield game.copy(), tuple(move)
+        game.apply_move(tuple(move))
@@ -0,0 +1,256 @@
+"""
+This file contains the `BitBoard` class, an alternative implementation of the
+Isolation game board that packs every blocked cell into a single integer
+bitmask. Knight moves are precomputed once per board size as one bitmask per
+cell, so the legal moves of a player are generated with a single bitwise AND.
+
+`BitBoard` is a drop-in replacement for `isolation.Board`; agents and the
+tournament script can use either class without modification.
+"""
+import random
+
+from .isolation import Board
+
+
+class BitBoard(Board):
+    """Implement a model for the game Isolation using a bitboard state.
+
+    Cells are indexed exactly as in `Board` (i.e., the cell at (row, col) is
+    bit number `row + col * height`), so move tuples and player locations are
+    interchangeable between the two implementations.
+
+    Parameters
+    ----------
+    player_1 : object
+        An object with a get_move() function. This is the only function
+        directly called by the Board class for each player.
+
+    player_2 : object
+        An object with a get_move() function. This is the only function
+        directly called by the Board class for each player.
+
+    width : int (optional)
+        The number of columns that the board should have.
+
+    height : int (optional)
+        The number of rows that the board should have.
+
+    shuffle_moves : bool (optional)
+        Return legal moves in random order (the default) or in a fixed,
+        deterministic order.
+    """
+    # Precomputed knight move masks shared by every board of the same size
+    _knight_masks = {}
+
+    def __init__(self, player_1, player_2, width=7, height=7, shuffle_moves=True):
+        self.width = width
+        self.height = height
+        self.shuffle_moves = shuffle_moves
+        self.move_count = 0
+        self._player_1 = player_1
+        self._player_2 = player_2
+        self._active_player = player_1
+        self._inactive_player = player_2
+
+        self._blocked = 0
+        self._p1_loc = Board.NOT_MOVED
+        self._p2_loc = Board.NOT_MOVED
+        self._undo_stack = []
+        self._neighbors = Board.neighbor_table(width, height)
+        self._masks = BitBoard.knight_masks(width, height)
+        self._zobrist = Board.zobrist_keys(width, height)
+        self._hash = 0
+
+    @classmethod
+    def knight_masks(cls, width, height):
+        """Return a tuple holding, for each cell index, the bitmask of all
+        cells reachable from that cell with a single knight move.
+        """
+        masks = cls._knight_masks.get((width, height))
+        if masks is None:
+            masks = tuple(sum(1 << i for i in neighbors)
+                          for neighbors in Board.neighbor_table(width, height))
+            cls._knight_masks[(width, height)] = masks
+        return masks
+
+    def copy(self):
+        """ Return a deep copy of the current board. """
+        new_board = BitBoard.__new__(BitBoard)
+        new_board.__dict__.update(self.__dict__)
+        new_board._undo_stack = list(self._undo_stack)
+        return new_board
+
+    def move_is_legal(self, move):
+        """Test whether a move is legal in the current game state.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+
+        Returns
+        -------
+        bool
+            Returns True if the move is legal, False otherwise
+        """
+        return (0 <= move[0] < self.height and 0 <= move[1] < self.width and
+                not self._blocked >> (move[0] + move[1] * self.height) & 1)
+
+    def get_blank_spaces(self):
+        """Return a list of the locations that are still available on the board.
+        """
+        height = self.height
+        return [(i % height, i // height) for i in self._decode(self._open_mask())]
+
+    def _open_mask(self):
+        """Return the bitmask of the open cells. """
+        return ~self._blocked & ((1 << self.width * self.height) - 1)
+
+    @staticmethod
+    def _decode(mask):
+        """Return the indexes of the set bits of `mask` in increasing order. """
+        indexes = []
+        while mask:
+            bit = mask & -mask
+            indexes.append(bit.bit_length() - 1)
+            mask ^= bit
+        return indexes
+
+    def get_player_index(self, player):
+        """Return the cell index (row + col * height) of the current location
+        of the specified player, or None if the player has not moved.
+        """
+        if player == self._player_1:
+            return self._p1_loc
+        if player == self._player_2:
+            return self._p2_loc
+        raise RuntimeError(
+            "Invalid player in get_player_location: {}".format(player))
+
+    def get_legal_moves(self, player=None):
+        """Return the list of all legal moves for the specified player.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            return the legal moves for the active player on the board.
+
+        Returns
+        -------
+        list<(int, int)>
+            The list of coordinate pairs (row, column) of all legal moves
+            for the player constrained by the current game state.
+        """
+        if player is None:
+            player = self._active_player
+        idx = self._p1_loc if player == self._player_1 else self._p2_loc
+        if idx == Board.NOT_MOVED:
+            return self.get_blank_spaces()
+
+        height = self.height
+        return [(i % height, i // height) for i in self.__get_moves(idx)]
+
+    def get_legal_move_indexes(self, player=None):
+        """Return the legal moves of the specified player (by default the
+        active player) as cell indexes (row + col * height) instead of
+        coordinate pairs. See `get_legal_moves()`.
+        """
+        if player is None:
+            player = self._active_player
+        idx = self._p1_loc if player == self._player_1 else self._p2_loc
+        if idx == Board.NOT_MOVED:
+            return self._decode(self._open_mask())
+        return self.__get_moves(idx)
+
+    def count_legal_moves(self, player=None):
+        """Return the number of legal moves of the specified player (by
+        default the active player), without building the list of moves.
+        """
+        if player is None:
+            player = self._active_player
+        idx = self._p1_loc if player == self._player_1 else self._p2_loc
+        if idx == Board.NOT_MOVED:
+            return self.count_blank_spaces()
+        return bin(self._masks[idx] & ~self._blocked).count("1")
+
+    def __get_moves(self, idx):
+        """Return the list of cell indexes of the open cells one knight move
+        away from cell index `idx`.
+        """
+        moves = self._masks[idx] & ~self._blocked
+        valid_moves = []
+        while moves:
+            bit = moves & -moves
+            valid_moves.append(bit.bit_length() - 1)
+            moves ^= bit
+        if self.shuffle_moves:
+            random.shuffle(valid_moves)
+        return valid_moves
+
+    def apply_move(self, move):
+        """Move the active player to a specified location.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        idx = move[0] + move[1] * self.height
+        if self._active_player == self._player_1:
+            self._update_hash(idx, self._p1_loc, 1)
+            self._p1_loc = idx
+        else:
+            self._update_hash(idx, self._p2_loc, 2)
+            self._p2_loc = idx
+        self._blocked |= 1 << idx
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count += 1
+
+    def push_move(self, move):
+        """Apply a move to the board in-place and record what is needed to
+        take it back with pop_move().
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        idx = move[0] + move[1] * self.height
+        if self._active_player == self._player_1:
+            self._update_hash(idx, self._p1_loc, 1)
+            self._undo_stack.append(self._p1_loc)
+            self._p1_loc = idx
+        else:
+            self._update_hash(idx, self._p2_loc, 2)
+            self._undo_stack.append(self._p2_loc)
+            self._p2_loc = idx
+        self._blocked |= 1 << idx
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count += 1
+
+    def pop_move(self):
+        """Take back the last move applied with push_move()."""
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count -= 1
+        if self._active_player == self._player_1:
+            idx, self._p1_loc = self._p1_loc, self._undo_stack.pop()
+            self._update_hash(idx, self._p1_loc, 1)
+        else:
+            idx, self._p2_loc = self._p2_loc, self._undo_stack.pop()
+            self._update_hash(idx, self._p2_loc, 2)
+        self._blocked ^= 1 << idx
+
+    def _cell_symbols(self, symbols):
+        """Return the character shown by to_string() for each cell index. """
+        cells = [' '] * (self.width * self.height)
+        for idx in self._decode(self._blocked):
+            cells[idx] = '-'
+        if self._p1_loc is not None:
+            cells[self._p1_loc] = symbols[0]
+        if self._p2_loc is not None:
+            cells[self._p2_loc] = symbols[1]
+        return cells
@@ -33,13 +33,24 @@ class Board(object):
 
     height : int (optional)
         The number of rows that the board should have.
+
+    shuffle_moves : bool (optional)
+        Return legal moves in random order (the default) or in a fixed,
+        deterministic order.
     """
     BLANK = 0
     NOT_MOVED = None
 
-    def __init__(self, player_1, player_2, width=7, height=7):
+    # Zobrist keys shared by every board of the same size
+    _zobrist_tables = {}
+
+    # Knight move neighbors shared by every board of the same size
+    _neighbor_tables = {}
+
+    def __init__(self, player_1, player_2, width=7, height=7, shuffle_moves=True):
         self.width = width
         self.height = height
+        self.shuffle_moves = shuffle_moves
         self.move_count = 0
         self._player_1 = player_1
         self._player_2 = player_2
@@ -52,8 +63,60 @@ class Board(object):
         self._board_state[-1] = Board.NOT_MOVED
         self._board_state[-2] = Board.NOT_MOVED
 
+        # Indexes of the open cells, so that listing them does not scan the
+        # blocked cells of large boards
+        self._open_cells = set(range(width * height))
+
+        # Previous locations of the moving player for each move applied with
+        # push_move(), so that pop_move() can restore them
+        self._undo_stack = []
+
+        # Zobrist hash of the current state, updated incrementally as moves
+        # are applied and taken back
+        self._zobrist = Board.zobrist_keys(width, height)
+        self._hash = 0
+
+        self._neighbors = Board.neighbor_table(width, height)
+
+    @classmethod
+    def neighbor_table(cls, width, height):
+        """Return a tuple holding, for each cell index, a tuple of the
+        indexes of the cells on the board one knight move away from it.
+        Cells are indexed as `row + col * height`.
+        """
+        table = cls._neighbor_tables.get((width, height))
+        if table is None:
+            directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                          (1, -2), (1, 2), (2, -1), (2, 1)]
+            table = tuple(
+                tuple(r + dr + (c + dc) * height for dr, dc in directions
+                      if 0 <= r + dr < height and 0 <= c + dc < width)
+                for r, c in ((idx % height, idx // height)
+                             for idx in range(width * height)))
+            cls._neighbor_tables[(width, height)] = table
+        return table
+
+    @classmethod
+    def zobrist_keys(cls, width, height):
+        """Return the Zobrist keys for a board of the given size as a tuple
+        (blocked, player 1 location, player 2 location, initiative). The
+        first three entries hold one random 64-bit key per cell index. The
+        keys are generated from a fixed seed, so hashes are reproducible.
+        """
+        keys = cls._zobrist_tables.get((width, height))
+        if keys is None:
+            rng = random.Random("{}x{}".format(width, height))
+            num_cells = width * height
+            keys = tuple(tuple(rng.getrandbits(64) for _ in range(num_cells))
+                         for _ in range(3)) + (rng.getrandbits(64),)
+            cls._zobrist_tables[(width, height)] = keys
+        return keys
+
     def hash(self):
-        return str(self._board_state).__hash__()
+        """Return the Zobrist hash of the current state, which covers the
+        blocked cells, both player locations, and the player to move.
+        """
+        return self._hash
 
     @property
     def active_player(self):
@@ -92,11 +155,15 @@ class Board(object):
 
     def copy(self):
         """ Return a deep copy of the current board. """
-        new_board = Board(self._player_1, self._player_2, width=self.width, height=self.height)
+        new_board = Board(self._player_1, self._player_2, width=self.width,
+                          height=self.height, shuffle_moves=self.shuffle_moves)
         new_board.move_count = self.move_count
         new_board._active_player = self._active_player
         new_board._inactive_player = self._inactive_player
         new_board._board_state = copy(self._board_state)
+        new_board._open_cells = set(self._open_cells)
+        new_board._undo_stack = copy(self._undo_stack)
+        new_board._hash = self._hash
         return new_board
 
     def forecast_move(self, move):
@@ -139,8 +206,14 @@ class Board(object):
     def get_blank_spaces(self):
         """Return a list of the locations that are still available on the board.
         """
-        return [(i, j) for j in range(self.width) for i in range(self.height)
-                if self._board_state[i + j * self.height] == Board.BLANK]
+        height = self.height
+        return [(i % height, i // height) for i in sorted(self._open_cells)]
+
+    def count_blank_spaces(self):
+        """Return the number of locations that are still available on the
+        board. Every move blocks exactly one cell.
+        """
+        return self.width * self.height - self.move_count
 
     def get_player_location(self, player):
         """Find the current location of the specified player on the board.
@@ -156,20 +229,21 @@ class Board(object):
             The coordinate pair (row, column) of the input player, or None
             if the player has not moved.
         """
+        idx = self.get_player_index(player)
+        if idx == Board.NOT_MOVED:
+            return Board.NOT_MOVED
+        return (idx % self.height, idx // self.height)
+
+    def get_player_index(self, player):
+        """Return the cell index (row + col * height) of the current location
+        of the specified player, or None if the player has not moved.
+        """
         if player == self._player_1:
-            if self._board_state[-1] == Board.NOT_MOVED:
-                return Board.NOT_MOVED
-            idx = self._board_state[-1]
-        elif player == self._player_2:
-            if self._board_state[-2] == Board.NOT_MOVED:
-                return Board.NOT_MOVED
-            idx = self._board_state[-2]
-        else:
-            raise RuntimeError(
-                "Invalid player in get_player_location: {}".format(player))
-        w = idx // self.height
-        h = idx % self.height
-        return (h, w)
+            return self._board_state[-1]
+        if player == self._player_2:
+            return self._board_state[-2]
+        raise RuntimeError(
+            "Invalid player in get_player_location: {}".format(player))
 
     def get_legal_moves(self, player=None):
         """Return the list of all legal moves for the specified player.
@@ -187,8 +261,36 @@ class Board(object):
             for the player constrained by the current game state.
         """
         if player is None:
-            player = self.active_player
-        return self.__get_moves(self.get_player_location(player))
+            player = self._active_player
+        idx = self.get_player_index(player)
+        if idx == Board.NOT_MOVED:
+            return self.get_blank_spaces()
+        height = self.height
+        return [(i % height, i // height) for i in self.__get_moves(idx)]
+
+    def get_legal_move_indexes(self, player=None):
+        """Return the legal moves of the specified player (by default the
+        active player) as cell indexes (row + col * height) instead of
+        coordinate pairs. See `get_legal_moves()`.
+        """
+        if player is None:
+            player = self._active_player
+        idx = self.get_player_index(player)
+        if idx == Board.NOT_MOVED:
+            return sorted(self._open_cells)
+        return self.__get_moves(idx)
+
+    def count_legal_moves(self, player=None):
+        """Return the number of legal moves of the specified player (by
+        default the active player), without building the list of moves.
+        """
+        if player is None:
+            player = self._active_player
+        idx = self.get_player_index(player)
+        if idx == Board.NOT_MOVED:
+            return self.count_blank_spaces()
+        state = self._board_state
+        return [state[i] for i in self._neighbors[idx]].count(Board.BLANK)
 
     def apply_move(self, move):
         """Move the active player to a specified location.
@@ -201,19 +303,70 @@ class Board(object):
         """
         idx = move[0] + move[1] * self.height
         last_move_idx = int(self.active_player == self._player_2) + 1
+        self._update_hash(idx, self._board_state[-last_move_idx], last_move_idx)
+        self._board_state[-last_move_idx] = idx
+        self._board_state[idx] = 1
+        self._open_cells.discard(idx)
+        self._board_state[-3] ^= 1
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count += 1
+
+    def push_move(self, move):
+        """Apply a move to the board in-place and record what is needed to
+        take it back with pop_move(). Search agents can use the pair to walk
+        the game tree on a single board instead of copying it at every node.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        idx = move[0] + move[1] * self.height
+        last_move_idx = int(self._active_player == self._player_2) + 1
+        self._update_hash(idx, self._board_state[-last_move_idx], last_move_idx)
+        self._undo_stack.append(self._board_state[-last_move_idx])
         self._board_state[-last_move_idx] = idx
         self._board_state[idx] = 1
+        self._open_cells.discard(idx)
         self._board_state[-3] ^= 1
         self._active_player, self._inactive_player = self._inactive_player, self._active_player
         self.move_count += 1
 
+    def pop_move(self):
+        """Take back the last move applied with push_move(), restoring the
+        board to the exact state it had before that move.
+        """
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count -= 1
+        last_move_idx = int(self._active_player == self._player_2) + 1
+        idx = self._board_state[-last_move_idx]
+        prev_idx = self._undo_stack.pop()
+        self._update_hash(idx, prev_idx, last_move_idx)
+        self._board_state[idx] = Board.BLANK
+        self._open_cells.add(idx)
+        self._board_state[-last_move_idx] = prev_idx
+        self._board_state[-3] ^= 1
+
+    def _update_hash(self, idx, prev_idx, player_num):
+        """Toggle the Zobrist keys for player `player_num` (1 or 2) moving
+        between `prev_idx` and `idx`. The update is its own inverse, so the
+        same call applies a move or takes it back.
+        """
+        blocked_keys = self._zobrist[0]
+        location_keys = self._zobrist[player_num]
+        h = self._hash ^ blocked_keys[idx] ^ location_keys[idx] ^ self._zobrist[3]
+        if prev_idx != Board.NOT_MOVED:
+            h ^= location_keys[prev_idx]
+        self._hash = h
+
     def is_winner(self, player):
         """ Test whether the specified player has won the game. """
-        return player == self._inactive_player and not self.get_legal_moves(self._active_player)
+        return player == self._inactive_player and not self.count_legal_moves(self._active_player)
 
     def is_loser(self, player):
         """ Test whether the specified player has lost the game. """
-        return player == self._active_player and not self.get_legal_moves(self._active_player)
+        return player == self._active_player and not self.count_legal_moves(self._active_player)
 
     def utility(self, player):
         """Returns the utility of the current game state from the perspective
@@ -237,7 +390,7 @@ class Board(object):
             a value of -inf if the player has lost, and a value of 0
             otherwise.
         """
-        if not self.get_legal_moves(self._active_player):
+        if not self.count_legal_moves(self._active_player):
 
             if player == self._inactive_player:
                 return float("inf")
@@ -247,19 +400,14 @@ class Board(object):
 
         return 0.
 
-    def __get_moves(self, loc):
-        """Generate the list of possible moves for an L-shaped motion (like a
-        knight in chess).
+    def __get_moves(self, idx):
+        """Generate the list of cell indexes of the possible moves for an
+        L-shaped motion (like a knight in chess) from cell index `idx`.
         """
-        if loc == Board.NOT_MOVED:
-            return self.get_blank_spaces()
-
-        r, c = loc
-        directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                      (1, -2), (1, 2), (2, -1), (2, 1)]
-        valid_moves = [(r + dr, c + dc) for dr, dc in directions
-                       if self.move_is_legal((r + dr, c + dc))]
-        random.shuffle(valid_moves)
+        state = self._board_state
+        valid_moves = [i for i in self._neighbors[idx] if state[i] == Board.BLANK]
+        if self.shuffle_moves:
+            random.shuffle(valid_moves)
         return valid_moves
 
     def print_board(self):
@@ -271,31 +419,33 @@ class Board(object):
         the location of each player and indicating which cells have been
         blocked, and which remain open.
         """
-        p1_loc = self._board_state[-1]
-        p2_loc = self._board_state[-2]
+        cells = self._cell_symbols(symbols)
+        height = self.height
 
-        col_margin = len(str(self.height - 1)) + 1
+        col_margin = len(str(height - 1)) + 1
         prefix = "{:<" + "{}".format(col_margin) + "}"
         offset = " " * (col_margin + 3)
-        out = offset + '   '.join(map(str, range(self.width))) + '\n\r'
-        for i in range(self.height):
-            out += prefix.format(i) + ' | '
-            for j in range(self.width):
-                idx = i + j * self.height
-                if not self._board_state[idx]:
-                    out += ' '
-                elif p1_loc == idx:
-                    out += symbols[0]
-                elif p2_loc == idx:
-                    out += symbols[1]
-                else:
-                    out += '-'
-                out += ' | '
-            out += '\n\r'
-
-        return out
-
-    def play(self, time_limit=TIME_LIMIT_MILLIS):
+        rows = [offset + '   '.join(map(str, range(self.width))) + '\n\r']
+        for i in range(height):
+            # Cell indexes run down the columns, so row i is every
+            # height-th cell starting from i
+            rows.append(prefix.format(i) + ' | ' +
+                        ' | '.join(cells[i::height]) + ' | \n\r')
+        return ''.join(rows)
+
+    def _cell_symbols(self, symbols):
+        """Return the character shown by to_string() for each cell index. """
+        p1_loc = self._board_state[-1]
+        p2_loc = self._board_state[-2]
+        cells = ['-' if blocked else ' '
+                 for blocked in self._board_state[:self.width * self.height]]
+        if p1_loc is not None:
+            cells[p1_loc] = symbols[0]
+        if p2_loc is not None:
+            cells[p2_loc] = symbols[1]
+        return cells
+
+    def play(self, time_limit=TIME_LIMIT_MILLIS, on_move=None):
         """Execute a match between the players by alternately soliciting them
         to select a move and applying it in the game.
 
@@ -305,6 +455,11 @@ class Board(object):
             The maximum number of milliseconds to allow before timeout
             during each turn.
 
+        on_move : callable (optional)
+            A function `on_move(player, move, elapsed)` called with every
+            move returned by a player, before the move is checked or applied,
+            and the number of milliseconds the player took to choose it.
+
         Returns
         ----------
         (player, list<[(int, int),]>, str)
@@ -329,6 +484,9 @@ class Board(object):
             if curr_move is None:
                 curr_move = Board.NOT_MOVED
 
+            if on_move is not None:
+                on_move(self._active_player, curr_move, time_limit - move_end)
+
             if move_end < 0:
                 return self._inactive_player, move_history, "timeout"
 
@@ -0,0 +1,106 @@
+"""
+This file contains the `BoardSnapshot` class, a compact immutable record of an
+Isolation position for agents that keep many positions in memory (e.g., the
+nodes of a search tree or the entries of an opening book).
+
+A snapshot holds only the blocked cells (packed into an integer bitmask), the
+cell index of each player and the player to move. It carries no references
+to the player objects or the board size, so it is much smaller than a
+`Board`, and it hashes and compares as a plain tuple.
+"""
+from collections import namedtuple
+
+from .isolation import Board
+from .bitboard import BitBoard
+
+
+class BoardSnapshot(namedtuple("BoardSnapshot",
+                               ["blocked", "p1_loc", "p2_loc", "initiative"])):
+    """Immutable snapshot of an Isolation position.
+
+    Cells are indexed as in `Board` (i.e., the cell at (row, col) is bit
+    number `row + col * height` of the bitmask), so a snapshot can only be
+    turned back into a board of the size it was taken from.
+
+    Attributes
+    ----------
+    blocked : int
+        Bitmask of the blocked cells.
+
+    p1_loc : int or None
+        Cell index of player 1, or None if player 1 has not moved.
+
+    p2_loc : int or None
+        Cell index of player 2, or None if player 2 has not moved.
+
+    initiative : int
+        0 if player 1 is to move, 1 if player 2 is to move.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_board(cls, game):
+        """Return the snapshot of the current position of `game`, which may be
+        a `Board` or a `BitBoard`.
+        """
+        if isinstance(game, BitBoard):
+            return cls(game._blocked, game._p1_loc, game._p2_loc,
+                       game.move_count & 1)
+        state = game._board_state
+        blocked = 0
+        for idx in range(game.width * game.height):
+            if state[idx] != Board.BLANK:
+                blocked |= 1 << idx
+        return cls(blocked, state[-1], state[-2], state[-3])
+
+    @property
+    def move_count(self):
+        """The number of moves played to reach the position, which is also
+        the number of blocked cells.
+        """
+        return bin(self.blocked).count("1")
+
+    def to_board(self, player_1, player_2, width=7, height=7,
+                 board_cls=Board, shuffle_moves=True):
+        """Return a new board of class `board_cls` (`Board` or `BitBoard`)
+        in the position of the snapshot, played by `player_1` and
+        `player_2`. The board has no moves to take back with pop_move().
+        """
+        game = board_cls(player_1, player_2, width, height, shuffle_moves)
+        if issubclass(board_cls, BitBoard):
+            game._blocked = self.blocked
+            game._p1_loc = self.p1_loc
+            game._p2_loc = self.p2_loc
+        else:
+            state = game._board_state
+            for idx in range(width * height):
+                if self.blocked >> idx & 1:
+                    state[idx] = 1
+                    game._open_cells.discard(idx)
+            state[-1] = self.p1_loc
+            state[-2] = self.p2_loc
+            state[-3] = self.initiative
+        game.move_count = self.move_count
+        if self.initiative:
+            game._active_player, game._inactive_player = player_2, player_1
+        game._hash = self.zobrist_hash(width, height)
+        return game
+
+    def zobrist_hash(self, width=7, height=7):
+        """Return the Zobrist hash of the position, equal to `Board.hash()`
+        for a board of the given size in the same position.
+        """
+        blocked_keys, p1_keys, p2_keys, side_key = Board.zobrist_keys(width, height)
+        h = 0
+        blocked = self.blocked
+        while blocked:
+            bit = blocked & -blocked
+            h ^= blocked_keys[bit.bit_length() - 1]
+            blocked ^= bit
+        if self.p1_loc is not None:
+            h ^= p1_keys[self.p1_loc]
+        if self.p2_loc is not None:
+            h ^= p2_keys[self.p2_loc]
+        if self.move_count & 1:
+            h ^= side_key
+        return h
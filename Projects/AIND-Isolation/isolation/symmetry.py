@@ -0,0 +1,166 @@
+"""
+This file contains the `BoardSymmetries` class, which maps Isolation
+positions and moves through the rotations and reflections of the board, so
+that tables of positions (transposition tables, opening books) can store one
+entry for all the symmetric images of a position.
+
+Positions are handled as `BoardSnapshot`s, whose blocked cells are packed
+into an integer bitmask. The bitmask of a symmetric image is built with one
+table lookup per byte of the mask instead of one operation per cell.
+"""
+from .snapshot import BoardSnapshot
+
+
+class BoardSymmetries:
+    """The symmetries of boards of one size. Square boards have 8 (the
+    rotations and reflections), other boards have 4 (the reflections and the
+    half turn). Symmetry number 0 is always the identity.
+
+    Use `BoardSymmetries.of(width, height)` to share the tables between all
+    users of one board size.
+
+    Parameters
+    ----------
+    width : int (optional)
+        The number of columns of the board.
+
+    height : int (optional)
+        The number of rows of the board.
+
+    Attributes
+    ----------
+    perms : list of tuple
+        For each symmetry, the cell permutation `perm` where the cell with
+        index `idx` (i.e., `row + col * height`) moves to `perm[idx]`.
+
+    inverse_perms : list of tuple
+        The inverse of each permutation in `perms`.
+
+    location_bytes : int
+        The number of bytes holding a player location (or any cell index)
+        in `canonical_key()`: one for boards of up to 255 cells.
+    """
+    _instances = {}
+
+    def __init__(self, width=7, height=7):
+        self.width = width
+        self.height = height
+        self.location_bytes = ((width * height).bit_length() + 7) // 8
+        transforms = [lambda r, c: (r, c),
+                      lambda r, c: (height - 1 - r, c),
+                      lambda r, c: (r, width - 1 - c),
+                      lambda r, c: (height - 1 - r, width - 1 - c)]
+        if width == height:
+            transforms += [lambda r, c: (c, r),
+                           lambda r, c: (c, height - 1 - r),
+                           lambda r, c: (width - 1 - c, r),
+                           lambda r, c: (width - 1 - c, height - 1 - r)]
+        self.perms = []
+        for transform in transforms:
+            perm = []
+            for idx in range(width * height):
+                r, c = transform(idx % height, idx // height)
+                perm.append(r + c * height)
+            self.perms.append(tuple(perm))
+        self.inverse_perms = [tuple(sorted(range(len(p)), key=p.__getitem__))
+                              for p in self.perms]
+        self._byte_tables = [self._make_byte_tables(p) for p in self.perms]
+
+    @classmethod
+    def of(cls, width, height):
+        """Return the shared `BoardSymmetries` of boards of the given size. """
+        symmetries = cls._instances.get((width, height))
+        if symmetries is None:
+            symmetries = cls._instances[(width, height)] = cls(width, height)
+        return symmetries
+
+    def __len__(self):
+        return len(self.perms)
+
+    @staticmethod
+    def _make_byte_tables(perm):
+        """Return one table per byte of a cell bitmask, mapping each value of
+        the byte to the bits it sets once its cells are moved by `perm`.
+        """
+        tables = []
+        for start in range(0, len(perm), 8):
+            table = [0] * 256
+            for byte in range(1, 256):
+                low_bit = (byte & -byte).bit_length() - 1
+                if start + low_bit < len(perm):
+                    table[byte] = table[byte & (byte - 1)] | 1 << perm[start + low_bit]
+            tables.append(table)
+        return tables
+
+    def transform_mask(self, mask, t):
+        """Return the bitmask of cells `mask` mapped through symmetry `t`. """
+        result = 0
+        for table in self._byte_tables[t]:
+            result |= table[mask & 0xff]
+            mask >>= 8
+        return result
+
+    def transform(self, snapshot, t):
+        """Return the `BoardSnapshot` of the image of `snapshot` under
+        symmetry `t`.
+        """
+        perm = self.perms[t]
+        blocked, p1_loc, p2_loc, initiative = snapshot
+        return BoardSnapshot(self.transform_mask(blocked, t),
+                             None if p1_loc is None else perm[p1_loc],
+                             None if p2_loc is None else perm[p2_loc],
+                             initiative)
+
+    def canonical_key(self, snapshot):
+        """Return (key, t) where the integer key identifies `snapshot` up to
+        symmetry and `t` is the symmetry mapping `snapshot` onto the
+        canonical image the key was packed from. The key holds the blocked
+        cells of the image followed by `location_bytes` bytes per player
+        location (0 for a player that has not moved, cell index + 1
+        otherwise).
+        """
+        blocked, p1_loc, p2_loc, _ = snapshot
+        shift = 8 * self.location_bytes
+        best = None
+        for t, perm in enumerate(self.perms):
+            key = self.transform_mask(blocked, t)
+            key = (key << shift) | (0 if p1_loc is None else perm[p1_loc] + 1)
+            key = (key << shift) | (0 if p2_loc is None else perm[p2_loc] + 1)
+            if best is None or key < best[0]:
+                best = (key, t)
+        return best
+
+    def canonical(self, snapshot):
+        """Return (canonical, t) where `canonical` is the `BoardSnapshot` of
+        the image of `snapshot` shared by all its symmetric images, and `t`
+        is the symmetry mapping `snapshot` onto it.
+        """
+        t = self.canonical_key(snapshot)[1]
+        return self.transform(snapshot, t), t
+
+    def canonical_hash(self, snapshot):
+        """Return (hash, t) where `hash` is the Zobrist hash of the canonical
+        image of `snapshot` (see `canonical()`) and `t` the symmetry mapping
+        `snapshot` onto it. Moves stored under the hash must be mapped with
+        `transform_move(move, t)` and read back with
+        `inverse_transform_move(move, t)`.
+        """
+        canonical, t = self.canonical(snapshot)
+        return canonical.zobrist_hash(self.width, self.height), t
+
+    def transform_move(self, move, t):
+        """Return the image of the (row, col) move `move` under symmetry
+        `t`. Moves outside the board (e.g., (-1, -1)) are returned as is.
+        """
+        return self._map_move(move, self.perms[t])
+
+    def inverse_transform_move(self, move, t):
+        """Return the move whose image under symmetry `t` is `move`. """
+        return self._map_move(move, self.inverse_perms[t])
+
+    def _map_move(self, move, perm):
+        row, col = move
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            return move
+        idx = perm[row + col * self.height]
+        return (idx % self.height, idx // self.height)
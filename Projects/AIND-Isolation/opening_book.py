@@ -0,0 +1,187 @@
+"""Build and use an opening book for isolation.
+
+The builder enumerates every position reachable in the first few plies of a
+game, searches each one offline with a fixed-depth alpha-beta search, and
+stores the best move. Positions that are rotations or reflections of each
+other share one entry, keyed by a canonical form of the position, so the
+book covers all symmetric openings at a fraction of the size.
+
+Books are saved in a compact binary file and loaded into a dict, so looking
+up a position during a game takes constant time.
+
+Example:
+
+    python opening_book.py --depth 3 --search-depth 5 --output book.bin
+"""
+import argparse
+import struct
+
+from isolation import Board, BoardSnapshot
+from isolation.symmetry import BoardSymmetries
+from sample_players import improved_score
+from game_agent import AlphaBetaPlayer, _replace_players
+
+MAGIC = b"ISOBOOK1"
+HEADER = struct.Struct("<8sHHI")  # magic, width, height, number of entries
+
+
+class OpeningBook:
+    """A table from canonical positions to the best move found offline.
+
+    Parameters
+    ----------
+    width : int (optional)
+        The number of columns of the boards covered by the book.
+
+    height : int (optional)
+        The number of rows of the boards covered by the book.
+    """
+
+    def __init__(self, width=7, height=7):
+        self.width = width
+        self.height = height
+        self.entries = {}
+        self.symmetries = BoardSymmetries.of(width, height)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def canonical_key(self, game):
+        """Return (key, transform) where key identifies the position of
+        `game` up to symmetry, and transform is the index of the symmetry
+        mapping `game` onto the canonical position.
+        """
+        return self.symmetries.canonical_key(BoardSnapshot.from_board(game))
+
+    def add(self, game, move):
+        """Record `move` as the best move of the active player in `game`. """
+        key, t = self.canonical_key(game)
+        idx = move[0] + move[1] * self.height
+        self.entries[key] = self.symmetries.perms[t][idx]
+
+    def lookup(self, game):
+        """Return the book move for the active player in `game`, or None if
+        the position is not in the book.
+        """
+        if (game.width, game.height) != (self.width, self.height):
+            return None
+        key, t = self.canonical_key(game)
+        idx = self.entries.get(key)
+        if idx is None:
+            return None
+        idx = self.symmetries.inverse_perms[t][idx]
+        return (idx % self.height, idx // self.height)
+
+    def save(self, path):
+        """Write the book to a binary file. Each entry is stored as a fixed
+        width little-endian key followed by a little-endian cell index, one
+        byte wide for boards of up to 255 cells.
+        """
+        key_size = self._key_size()
+        idx_size = self.symmetries.location_bytes
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.width, self.height, len(self.entries)))
+            for key, idx in sorted(self.entries.items()):
+                f.write(key.to_bytes(key_size, "little"))
+                f.write(idx.to_bytes(idx_size, "little"))
+
+    @classmethod
+    def load(cls, path):
+        """Read a book written by `save()`. """
+        with open(path, "rb") as f:
+            magic, width, height, count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError("{} is not an opening book file".format(path))
+            book = cls(width, height)
+            key_size = book._key_size()
+            data = f.read()
+        record_size = key_size + book.symmetries.location_bytes
+        for offset in range(0, count * record_size, record_size):
+            key = int.from_bytes(data[offset:offset + key_size], "little")
+            book.entries[key] = int.from_bytes(
+                data[offset + key_size:offset + record_size], "little")
+        return book
+
+    def _key_size(self):
+        location_bits = 16 * self.symmetries.location_bytes
+        return (self.width * self.height + location_bits + 7) // 8
+
+
+class BookPlayer:
+    """Wrap an isolation agent to play moves from an opening book while the
+    game is still in the book, and fall back to the agent's own search
+    otherwise.
+
+    Parameters
+    ----------
+    player : object
+        The agent used for positions that are not in the book.
+
+    book : OpeningBook
+        The opening book to play from.
+    """
+
+    def __init__(self, player, book):
+        self.player = player
+        self.book = book
+
+    def get_move(self, game, time_left):
+        move = self.book.lookup(game)
+        if move is not None and move in game.get_legal_moves():
+            return move
+        # The wrapped agent looks itself up on the board, so it searches a
+        # copy in which it takes the place of this wrapper
+        return self.player.get_move(_replace_players(game, {self: self.player}),
+                                    time_left)
+
+
+def build_book(depth, search_depth, width=7, height=7, score_fn=improved_score,
+               progress=None):
+    """Search every position reachable in fewer than `depth` plies (up to
+    symmetry) to `search_depth` plies and return an `OpeningBook` with the
+    best move of each.
+    """
+    book = OpeningBook(width, height)
+    searchers = [AlphaBetaPlayer(score_fn=score_fn, search_depth=search_depth)
+                 for _ in range(2)]
+    for searcher in searchers:
+        searcher.time_left = lambda: float("inf")
+
+    frontier = [Board(searchers[0], searchers[1], width, height,
+                      shuffle_moves=False)]
+    for ply in range(depth):
+        next_frontier = {}
+        for game in frontier:
+            book.add(game, game.active_player.alphabeta(game, search_depth))
+            if progress is not None:
+                progress(ply, len(book))
+            for move in game.get_legal_moves():
+                child = game.forecast_move(move)
+                next_frontier.setdefault(book.canonical_key(child)[0], child)
+        frontier = list(next_frontier.values())
+    return book
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--depth", type=int, default=3,
+                        help="number of plies covered by the book")
+    parser.add_argument("--search-depth", type=int, default=5,
+                        help="alpha-beta search depth for each position")
+    parser.add_argument("--width", type=int, default=7)
+    parser.add_argument("--height", type=int, default=7)
+    parser.add_argument("--output", default="book.bin",
+                        help="path of the book file to write")
+    args = parser.parse_args()
+
+    def progress(ply, size):
+        print("\rply {}: {} positions".format(ply, size), end="", flush=True)
+
+    book = build_book(args.depth, args.search_depth, args.width, args.height,
+                      progress=progress)
+    book.save(args.output)
+    print("\nSaved {} positions to {}".format(len(book), args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Re-evaluate the positions of recorded games with a fixed-depth alpha-beta
+search to find the moves where an agent blundered.
+
+Every legal move of every recorded position is searched to the given depth
+with the chosen heuristic. A move is reported as a blunder when its value
+falls short of the best move's value by at least the threshold, or when it
+turns a won position into an unknown or lost one. Games are read from a log
+written by `tournament.py --log` (see game_log.py) and can be analyzed in
+parallel with --workers.
+
+Example:
+
+    python tournament.py --log games.jsonl
+    python replay.py games.jsonl --player AB_Custom --depth 5 --workers 4
+"""
+import argparse
+import json
+
+from collections import namedtuple
+
+from game_log import read_games, replay_positions
+from sample_players import improved_score, open_move_score, center_score
+from game_agent import (AlphaBetaPlayer, custom_score, custom_score_2,
+                        custom_score_3)
+from tournament import make_pool
+
+DEPTH = 4  # search depth used to evaluate the moves
+THRESHOLD = 2.  # smallest loss of value reported as a blunder
+
+HEURISTICS = {
+    "improved": improved_score,
+    "open": open_move_score,
+    "center": center_score,
+    "custom": custom_score,
+    "custom_2": custom_score_2,
+    "custom_3": custom_score_3,
+}
+
+Blunder = namedtuple("Blunder", ["game", "ply", "player", "move", "value",
+                                 "best_move", "best_value"])
+
+
+def evaluate_moves(game, searcher, depth):
+    """Return a dict mapping each legal move of the active player in `game`,
+    which must be `searcher`, to its value searched to `depth` plies.
+    """
+    searcher.time_left = lambda: float("inf")
+    return {move: searcher.search_root_moves(game, depth, [move])[0]
+            for move in game.get_legal_moves()}
+
+
+def is_blunder(value, best_value, threshold):
+    """Test whether playing a move of `value` instead of one of `best_value`
+    loses at least `threshold`, counting any move that misses a win.
+    """
+    if best_value == value:
+        return False
+    if best_value == float("inf"):
+        return True
+    return best_value - value >= threshold
+
+
+def analyze_game(task):
+    """Return the list of `Blunder`s in one game record. """
+    index, record, heuristic, depth, threshold, player_name = task
+    searchers = [AlphaBetaPlayer(score_fn=HEURISTICS[heuristic],
+                                 endgame_solver=False) for _ in range(2)]
+    blunders = []
+    ply = len(record["opening"])
+    for game, move in replay_positions(record, *searchers):
+        name = record["players"][game.move_count % 2]
+        if player_name is None or name == player_name:
+            values = evaluate_moves(game, game.active_player, depth)
+            best_move = max(values, key=values.get)
+            if is_blunder(values[move], values[best_move], threshold):
+                blunders.append(Blunder(index, ply, name, move, values[move],
+                                        best_move, values[best_move]))
+        ply += 1
+    return blunders
+
+
+def analyze(path, heuristic="improved", depth=DEPTH, threshold=THRESHOLD,
+            player_name=None, pool=None):
+    """Yield the `Blunder`s of every game in the log at `path`, game by game,
+    analyzing the games in this process or on the workers of `pool`.
+    """
+    tasks = ((index, record, heuristic, depth, threshold, player_name)
+             for index, record in enumerate(read_games(path)))
+    results = map(analyze_game, tasks) if pool is None else pool.imap(analyze_game, tasks)
+    for blunders in results:
+        yield from blunders
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("log", help="game log written by tournament.py --log")
+    parser.add_argument("--heuristic", choices=sorted(HEURISTICS),
+                        default="improved",
+                        help="heuristic used to evaluate the positions")
+    parser.add_argument("--depth", type=int, default=DEPTH,
+                        help="search depth used to evaluate the moves")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="smallest loss of value reported as a blunder")
+    parser.add_argument("--player", help="only analyze the moves of this agent")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of games to analyze in parallel")
+    parser.add_argument("--output", help="write the blunders to this JSON "
+                                         "lines file instead of printing them")
+    args = parser.parse_args()
+
+    pool = make_pool(args.workers) if args.workers > 1 else None
+    blunders = analyze(args.log, args.heuristic, args.depth, args.threshold,
+                       args.player, pool)
+    try:
+        if args.output:
+            with open(args.output, "w") as f:
+                for blunder in blunders:
+                    f.write(json.dumps(blunder._asdict()) + "\n")
+        else:
+            print("{:>6}{:>6}  {:<14}{:>8}{:>9}{:>8}{:>9}".format(
+                "Game", "Ply", "Player", "Move", "Value", "Best", "Value"))
+            for b in blunders:
+                print("{:>6}{:>6}  {:<14}{:>8}{:>9.2f}{:>8}{:>9.2f}".format(
+                    b.game, b.ply, b.player, "{},{}".format(*b.move), b.value,
+                    "{},{}".format(*b.best_move), b.best_value))
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Unit tests for the Monte Carlo Tree Search competition agent."""
+
+import pickle
+import unittest
+import timeit
+
+import isolation
+import competition_agent
+
+from importlib import reload
+
+
+class CustomPlayerTest(unittest.TestCase):
+    """Unit tests for the MCTS agent"""
+
+    def setUp(self):
+        reload(competition_agent)
+        self.player1 = competition_agent.CustomPlayer(timeout=10.)
+        self.player2 = "Player2"
+        self.game = isolation.Board(self.player1, self.player2)
+        self.game.apply_move((3, 3))
+        self.game.apply_move((0, 5))
+
+    def time_left(self, limit=50.):
+        start = 1000 * timeit.default_timer()
+        return lambda: limit - (1000 * timeit.default_timer() - start)
+
+    def test_get_move_is_legal_and_board_untouched(self):
+        before = self.game.to_string()
+        move = self.player1.get_move(self.game, self.time_left())
+        self.assertIn(move, self.game.get_legal_moves())
+        self.assertEqual(before, self.game.to_string())
+        self.assertGreater(self.player1.iterations, 0)
+
+    def test_pickles_after_move(self):
+        # Players are sent to tournament workers after playing in-process
+        self.player1.get_move(self.game, self.time_left())
+        player = pickle.loads(pickle.dumps(self.player1))
+        self.assertIsNone(player.time_left)
+
+    def test_tree_reused_after_reply(self):
+        move = self.player1.get_move(self.game, self.time_left())
+        self.game.apply_move(move)
+        reply = sorted(self.game.get_legal_moves())[0]
+        expected = self.player1._root.children[move].children.get(reply)
+        self.game.apply_move(reply)
+        self.assertIs(self.player1._reuse_tree(self.game), expected)
+
+    def test_returns_no_move_when_stuck(self):
+        game = isolation.Board(self.player1, self.player2, width=3, height=3)
+        game.apply_move((1, 1))
+        game.apply_move((0, 0))
+        self.assertEqual(self.player1.get_move(game, self.time_left()), (-1, -1))
+
+
+if __name__ == '__main__':
+    unittest.main()
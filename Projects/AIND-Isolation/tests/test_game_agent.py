@@ -3,14 +3,48 @@ tests to run and debug your minimax and alphabeta agents locally.  The test
 cases used by the project assistant are not public.
 """
 
+import math
+import pickle
+import random
+import types
 import unittest
 
 import isolation
 import game_agent
+import sample_players
 
 from importlib import reload
 
 
+def play_random_moves(game, plies, rng):
+    """Apply `plies` random legal moves to `game`. """
+    for _ in range(plies):
+        game.apply_move(rng.choice(sorted(game.get_legal_moves())))
+
+
+def minimax_value(game, move, depth, player):
+    """Return the minimax value for `player`, searched to `depth` plies with
+    its heuristic, of playing `move` in `game`.
+    """
+    searcher = game_agent.MinimaxPlayer(score_fn=player.score)
+    searcher.time_left = lambda: 1000.
+    child = game.forecast_move(move)
+    return searcher.min_value(child, depth - 1, player)
+
+
+class MinimaxCheckMixin:
+    """Compare the moves chosen by a search against plain minimax"""
+
+    def assertMinimaxBest(self, game, move, depth, player):
+        """Assert that `move` has the highest minimax value of the legal
+        moves of `player` in `game` searched to `depth`, and return it.
+        """
+        best = max(minimax_value(game, m, depth, player)
+                   for m in game.get_legal_moves())
+        self.assertEqual(best, minimax_value(game, move, depth, player))
+        return best
+
+
 class IsolationTest(unittest.TestCase):
     """Unit tests for isolation agents"""
 
@@ -25,5 +59,386 @@ class IsolationTest(unittest.TestCase):
         self.fail("Hello, World!")
 
 
+class SearchTest(unittest.TestCase):
+    """Check that search agents leave the board they search untouched"""
+
+    def setUp(self):
+        reload(game_agent)
+        self.player1 = game_agent.AlphaBetaPlayer()
+        self.player2 = game_agent.MinimaxPlayer()
+        self.game = isolation.Board(self.player1, self.player2)
+        self.game.apply_move((3, 3))
+        self.game.apply_move((0, 5))
+
+    def test_minimax_restores_board(self):
+        before = self.game.to_string()
+        self.player2.time_left = lambda: 1000.
+        move = self.player2.minimax(self.game.forecast_move((1, 2)), 3)
+        self.assertIn(move, self.game.forecast_move((1, 2)).get_legal_moves())
+        self.assertEqual(before, self.game.to_string())
+
+    def test_players_pickle_after_move(self):
+        # Players are sent to tournament workers after playing in-process,
+        # when time_left still holds the clock local to Board.play()
+        for player in (self.player1, self.player2):
+            player.time_left = lambda: 1000.
+            copy = pickle.loads(pickle.dumps(player))
+            self.assertIsNone(copy.time_left)
+            self.assertIsNotNone(player.time_left)
+
+    def test_alphabeta_restores_board(self):
+        before = self.game.to_string()
+        self.player1.time_left = lambda: 1000.
+        move = self.player1.alphabeta(self.game, 4)
+        self.assertIn(move, self.game.get_legal_moves())
+        self.assertEqual(before, self.game.to_string())
+
+
+class TranspositionTableTest(MinimaxCheckMixin, unittest.TestCase):
+    """Check that the transposition table does not change search results"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_iterative_deepening_matches_minimax(self):
+        rng = random.Random(1)
+        for _ in range(5):
+            player1 = game_agent.AlphaBetaPlayer()
+            player2 = game_agent.AlphaBetaPlayer(tt_size=0)
+            game = isolation.Board(player1, player2)
+            play_random_moves(game, rng.randint(2, 12), rng)
+            if len(game.get_legal_moves()) < 2:
+                continue
+            if game.active_player != player1:
+                play_random_moves(game, 1, rng)
+
+            player1.time_left = lambda: 1000.
+            for depth in range(1, 5):
+                move = player1.alphabeta(game, depth)
+            if game.get_legal_moves():
+                self.assertMinimaxBest(game, move, 4, player1)
+
+
+class AspirationSearchTest(MinimaxCheckMixin, unittest.TestCase):
+    """Check that narrow search windows do not change search results"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_any_guess_matches_minimax(self):
+        rng = random.Random(3)
+        for guess in (-5., -0.5, 0., 0.5, 5.):
+            player = game_agent.AlphaBetaPlayer(aspiration_window=0.25)
+            player.time_left = lambda: 1000.
+            game = isolation.Board(player, "Player2")
+            play_random_moves(game, 2 * rng.randint(1, 6), rng)
+            if not game.get_legal_moves():
+                continue
+            move = player.aspiration_search(game, 4, guess)
+            self.assertEqual(self.assertMinimaxBest(game, move, 4, player),
+                             player.root_score)
+
+
+class NullWindowTest(MinimaxCheckMixin, unittest.TestCase):
+    """Check the null windows of the principal variation search on Python
+    versions without `math.nextafter`
+    """
+
+    def setUp(self):
+        reload(game_agent)
+        game_agent.math = types.SimpleNamespace(
+            **{name: getattr(math, name) for name in dir(math)
+               if name != "nextafter"})
+
+    def tearDown(self):
+        game_agent.math = math
+
+    def test_fallback_matches_minimax(self):
+        rng = random.Random(5)
+        for _ in range(5):
+            player = game_agent.AlphaBetaPlayer(tt_size=0)
+            player.time_left = lambda: 1000.
+            game = isolation.Board(player, "Player2")
+            play_random_moves(game, 2 * rng.randint(1, 6), rng)
+            if not game.get_legal_moves():
+                continue
+            move = player.alphabeta(game, 4)
+            self.assertMinimaxBest(game, move, 4, player)
+
+
+class MoveOrdererTest(unittest.TestCase):
+    """Check the priority of the move ordering heuristics"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_order(self):
+        orderer = game_agent.MoveOrderer()
+        moves = [(0, 0), (1, 1), (2, 2), (3, 3), (4, 4)]
+        orderer.record_cutoff((4, 4), 3, 1)
+        orderer.record_cutoff((2, 2), 1, 3)
+        orderer.record_cutoff((1, 1), 1, 1)
+        self.assertEqual(orderer.order(moves, 1, tt_move=(3, 3)),
+                         [(3, 3), (1, 1), (2, 2), (4, 4), (0, 0)])
+        self.assertEqual(orderer.order(moves, 2)[:2], [(2, 2), (1, 1)])
+
+    def test_new_search_forgets_killers(self):
+        orderer = game_agent.MoveOrderer()
+        orderer.record_cutoff((1, 1), 1, 4)
+        orderer.new_search()
+        self.assertEqual(orderer.killers, {})
+        self.assertEqual(orderer.history, {(1, 1): 8})
+
+
+class BatchScoreTest(unittest.TestCase):
+    """Check that the batch heuristics match their scalar versions"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_batch_matches_scalar(self):
+        pairs = [(game_agent.custom_score, game_agent.batch_custom_score),
+                 (game_agent.custom_score_2, game_agent.batch_custom_score_2),
+                 (game_agent.custom_score_3, game_agent.batch_custom_score_3),
+                 (sample_players.improved_score, game_agent.batch_improved_score)]
+        rng = random.Random(0)
+        for _ in range(50):
+            game = isolation.Board("Player1", "Player2")
+            for _ in range(rng.randint(2, 40)):
+                moves = sorted(game.get_legal_moves())
+                if not moves:
+                    break
+                game.apply_move(rng.choice(moves))
+            moves = game.get_legal_moves()
+            if not moves:
+                continue
+            for player in ("Player1", "Player2"):
+                for score_fn, batch_score_fn in pairs:
+                    self.assertEqual(
+                        [score_fn(game.forecast_move(m), player) for m in moves],
+                        batch_score_fn(game, player, moves))
+
+
+class ParallelSearchTest(MinimaxCheckMixin, unittest.TestCase):
+    """Check that splitting the root moves does not change search results"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_parallel_search_matches_minimax(self):
+        rng = random.Random(2)
+        player = game_agent.ParallelAlphaBetaPlayer(workers=2)
+        player.time_left = lambda: float("inf")
+        try:
+            for _ in range(3):
+                game = isolation.Board(player, "Player2")
+                play_random_moves(game, 2 * rng.randint(1, 6), rng)
+                if len(game.get_legal_moves()) < 2:
+                    continue
+                move = player.parallel_search(game, 3)
+                self.assertMinimaxBest(game, move, 3, player)
+        finally:
+            player.close()
+
+
+class DeadlineTest(unittest.TestCase):
+    """Check that spacing out the clock readings keeps the deadline"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_stops_near_threshold(self):
+        for player in (game_agent.MinimaxPlayer(search_depth=20),
+                       game_agent.AlphaBetaPlayer()):
+            game = isolation.Board(player, sample_players.GreedyPlayer())
+            game.apply_move((3, 3))
+            game.apply_move((0, 5))
+
+            # A clock on which every searched node takes 10 microseconds
+            readings = []
+            def time_left():
+                readings.append(150. - 0.01 * player.nodes_searched)
+                return readings[-1]
+            player.get_move(game, time_left)
+
+            self.assertLess(readings[-1], player.TIMER_THRESHOLD)
+            self.assertGreater(readings[-1], player.TIMER_THRESHOLD *
+                               (1 - player.CHECK_FRACTION) - 0.01)
+            self.assertLess(len(readings), player.nodes_searched / 10)
+
+
+class SearchStatsTest(unittest.TestCase):
+    """Check the per-move search statistics"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def play_move(self, player):
+        game = isolation.Board(player, sample_players.GreedyPlayer())
+        game.apply_move((3, 3))
+        game.apply_move((0, 5))
+        return player.get_move(game, lambda: 1000. - 0.05 * player.nodes_searched)
+
+    def test_collects_move_stats(self):
+        received = []
+        for player in (game_agent.MinimaxPlayer(),
+                       game_agent.AlphaBetaPlayer(endgame_solver=False)):
+            player.stats = game_agent.SearchStats(
+                lambda p, move_stats: received.append(move_stats))
+            score_fn = player.score
+            self.play_move(player)
+
+            move_stats, = player.stats.moves
+            self.assertEqual(move_stats.depth, player.depth_reached)
+            self.assertGreaterEqual(move_stats.depth, player.search_depth)
+            self.assertEqual(move_stats.nodes, player.nodes_searched)
+            self.assertEqual(sum(move_stats.cutoffs_by_ply), player.cutoffs)
+            self.assertGreater(move_stats.score_seconds, 0)
+            self.assertGreater(move_stats.movegen_seconds, 0)
+            self.assertLess(move_stats.score_seconds + move_stats.movegen_seconds,
+                            move_stats.seconds)
+            self.assertGreaterEqual(move_stats.margin, 0)
+            self.assertEqual(received[-1], move_stats)
+
+            # The player is restored after the move
+            self.assertIs(player.score, score_fn)
+            self.assertNotIn("_record_cutoff", player.__dict__)
+            self.assertFalse(player.stats.active)
+
+        summary = player.stats.summary()
+        self.assertEqual(summary["moves"], 1)
+        self.assertEqual(summary["cutoffs_by_ply"], list(move_stats.cutoffs_by_ply))
+
+    def test_disabled_by_default(self):
+        player = game_agent.AlphaBetaPlayer()
+        score_fn = player.score
+        self.play_move(player)
+        self.assertIsNone(player.stats)
+        self.assertIs(player.score, score_fn)
+        self.assertGreater(player.depth_reached, 0)
+
+
+class FirstMoveTest(unittest.TestCase):
+    """Check that first moves are played without searching"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_plays_center(self):
+        for size in (7, 25):
+            for player in (game_agent.MinimaxPlayer(), game_agent.AlphaBetaPlayer()):
+                game = isolation.Board(player, "Player2", size, size)
+                center = (size // 2, size // 2)
+                self.assertEqual(player.get_move(game, lambda: 100.), center)
+                self.assertEqual(player.nodes_searched, 0)
+
+                # Next to the center if the opponent took it
+                game = isolation.Board("Player1", player, size, size)
+                game.apply_move(center)
+                move = player.get_move(game, lambda: 100.)
+                self.assertIn(move, game.get_legal_moves())
+                self.assertEqual(max(abs(move[0] - center[0]),
+                                     abs(move[1] - center[1])), 1)
+
+        player = game_agent.AlphaBetaPlayer()
+        game = isolation.Board(player, "Player2")
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        self.assertIsNone(player.first_move(game))
+
+
+class EndgameSolverTest(unittest.TestCase):
+    """Check the partition detection and the exact endgame solver"""
+
+    def setUp(self):
+        reload(game_agent)
+        self.player = game_agent.AlphaBetaPlayer()
+        self.player.time_left = lambda: float("inf")
+
+    def longest_path(self, loc, blank):
+        """Brute force the longest knight path from `loc` over `blank`. """
+        best = 0
+        for dr, dc in [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                       (1, -2), (1, 2), (2, -1), (2, 1)]:
+            cell = (loc[0] + dr, loc[1] + dc)
+            if cell in blank:
+                best = max(best, 1 + self.longest_path(cell, blank - {cell}))
+        return best
+
+    def test_shared_region_is_not_solved(self):
+        game = isolation.Board(self.player, "Player2", 5, 5)
+        game.apply_move((2, 2))
+        game.apply_move((0, 0))
+        self.assertIsNone(self.player.endgame_move(game))
+
+    def test_matches_brute_force(self):
+        rng = random.Random(0)
+        solved = 0
+        while solved < 20:
+            game = isolation.Board(self.player, "Player2", 5, 5)
+            while game.get_legal_moves():
+                if game.active_player is self.player and game.move_count >= 2:
+                    move = self.player.endgame_move(game)
+                    if move is not None:
+                        blank = set(game.get_blank_spaces())
+                        expected = max(1 + self.longest_path(m, blank - {m})
+                                       for m in game.get_legal_moves())
+                        self.assertIn(move, game.get_legal_moves())
+                        self.assertEqual(
+                            expected, 1 + self.longest_path(move, blank - {move}))
+                        solved += 1
+                        break
+                game.apply_move(rng.choice(sorted(game.get_legal_moves())))
+
+    def test_timeout_keeps_moves_open(self):
+        # With no time to solve any move, the move leaving the most moves
+        # open in the region is played rather than the first legal move
+        self.player.time_left = lambda: 0.
+        rng = random.Random(0)
+        checked = 0
+        while checked < 20:
+            game = isolation.Board(self.player, "Player2", 5, 5)
+            while game.get_legal_moves():
+                if game.active_player is self.player and game.move_count >= 2:
+                    self.player.reset_clock()
+                    move = self.player.endgame_move(game)
+                    if move is not None:
+                        blank = set(game.get_blank_spaces())
+                        onward = {m: len(self.knight_moves(m, blank - {m}))
+                                  for m in game.get_legal_moves()}
+                        self.assertEqual(onward[move], max(onward.values()))
+                        checked += 1
+                        break
+                game.apply_move(rng.choice(sorted(game.get_legal_moves())))
+
+    def knight_moves(self, loc, blank):
+        return [(loc[0] + dr, loc[1] + dc)
+                for dr, dc in [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                               (1, -2), (1, 2), (2, -1), (2, 1)]
+                if (loc[0] + dr, loc[1] + dc) in blank]
+
+    def test_board_sizes_do_not_share_paths(self):
+        # Cell indexes depend on the board height, so the paths memoized on
+        # a 4x3 board must not be read on a 3x4 board
+        game = isolation.Board(self.player, "Player2", 4, 3)
+        for move in [(1, 3), (0, 2), (0, 1), (1, 0), (2, 0), (2, 2)]:
+            game.apply_move(move)
+        self.assertIsNotNone(self.player.endgame_move(game))
+
+        fresh = game_agent.AlphaBetaPlayer()
+        fresh.time_left = lambda: float("inf")
+        lengths = []
+        for player in (fresh, self.player):
+            game = isolation.Board(player, "Player2", 3, 4)
+            for move in [(2, 1), (3, 0), (0, 2), (2, 2), (1, 0), (0, 1),
+                         (3, 1), (2, 0), (1, 2), (3, 2)]:
+                game.apply_move(move)
+            player.endgame_move(game)
+            masks = game_agent._knight_masks(game)
+            open_mask = game_agent._open_mask(game)
+            lengths.append([player.longest_path(r + c * 4, open_mask & ~(1 << (r + c * 4)), masks)
+                            for r, c in sorted(game.get_legal_moves())])
+        self.assertEqual(lengths[1], lengths[0])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,86 @@
+"""Unit tests for the game log and the replay tool."""
+
+import os
+import random
+import tempfile
+import unittest
+
+import isolation
+import game_log
+import replay
+import sample_players
+
+
+def play_recorded_game(seed):
+    """Play a game between a random and a greedy agent from a fixed opening
+    and return its record, its move history and the final board.
+    """
+    random.seed(seed)
+    player1 = sample_players.RandomPlayer()
+    player2 = sample_players.GreedyPlayer()
+    game = isolation.Board(player1, player2)
+    opening = [(3, 3), (0, 5)]
+    for move in opening:
+        game.apply_move(move)
+    recorder = game_log.GameRecorder(
+        game, {player1: "Random", player2: "Greedy"}, opening, seed, 150)
+    winner, history, termination = game.play(on_move=recorder.on_move)
+    return recorder.finish(winner, termination), history, game
+
+
+class GameLogTest(unittest.TestCase):
+    """Check that recorded games can be written, read and replayed"""
+
+    def test_round_trip(self):
+        records = [play_recorded_game(seed)[0] for seed in range(3)]
+        path = os.path.join(tempfile.mkdtemp(), "games.jsonl")
+        with game_log.GameLogWriter(path) as log:
+            for record in records:
+                log.write(record)
+        self.assertEqual(records, list(game_log.read_games(path)))
+
+    def test_record(self):
+        record, history, _ = play_recorded_game(0)
+        self.assertEqual(record["players"], ["Random", "Greedy"])
+        self.assertEqual(record["moves"], history + [[-1, -1]])
+        self.assertEqual(len(record["times"]), len(record["moves"]))
+        self.assertEqual(record["nodes"], [None] * len(record["moves"]))
+        self.assertEqual(record["termination"], "illegal move")
+
+    def test_replay_reaches_final_position(self):
+        record, history, final = play_recorded_game(1)
+        positions = list(game_log.replay_positions(record))
+        self.assertEqual(len(positions), len(history))
+        game, move = positions[-1]
+        game.apply_move(move)
+        self.assertEqual(game.to_string(), final.to_string())
+
+
+class ReplayTest(unittest.TestCase):
+    """Check the blunder detection of the replay tool"""
+
+    def test_is_blunder(self):
+        inf = float("inf")
+        self.assertFalse(replay.is_blunder(1., 2., 2.))
+        self.assertTrue(replay.is_blunder(0., 2., 2.))
+        self.assertTrue(replay.is_blunder(5., inf, 2.))
+        self.assertTrue(replay.is_blunder(-inf, 0., 2.))
+        self.assertFalse(replay.is_blunder(inf, inf, 2.))
+        self.assertFalse(replay.is_blunder(-inf, -inf, 2.))
+
+    def test_analyze_game(self):
+        record, _, _ = play_recorded_game(0)
+        blunders = replay.analyze_game((0, record, "improved", 2, 1., None))
+        self.assertTrue(blunders)
+        for blunder in blunders:
+            self.assertEqual(blunder.player,
+                             record["players"][blunder.ply % 2])
+            self.assertEqual(list(blunder.move), record["moves"][blunder.ply - 2])
+            self.assertGreaterEqual(blunder.best_value - blunder.value, 1.)
+
+        greedy = replay.analyze_game((0, record, "improved", 2, 1., "Greedy"))
+        self.assertEqual(greedy, [b for b in blunders if b.player == "Greedy"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,223 @@
+"""Unit tests for the board implementations in the isolation package."""
+
+import random
+import unittest
+
+import isolation
+
+
+class BitBoardTest(unittest.TestCase):
+    """Check that BitBoard follows exactly the same rules as Board"""
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def play_in_lockstep(self, seed, width=7, height=7):
+        rng = random.Random(seed)
+        board = isolation.Board(self.player1, self.player2, width, height)
+        bitboard = isolation.BitBoard(self.player1, self.player2, width, height)
+        while True:
+            self.assertEqual(sorted(board.get_legal_moves()),
+                             sorted(bitboard.get_legal_moves()))
+            self.assertEqual(sorted(board.get_legal_moves(self.player2)),
+                             sorted(bitboard.get_legal_moves(self.player2)))
+            self.assertEqual(board.get_blank_spaces(), bitboard.get_blank_spaces())
+            self.assertEqual(board.to_string(), bitboard.to_string())
+            self.assertEqual(board.count_blank_spaces(), bitboard.count_blank_spaces())
+            for player in (self.player1, self.player2):
+                self.assertEqual(board.get_player_location(player),
+                                 bitboard.get_player_location(player))
+                self.assertEqual(board.get_player_index(player),
+                                 bitboard.get_player_index(player))
+                self.assertEqual(sorted(board.get_legal_move_indexes(player)),
+                                 sorted(bitboard.get_legal_move_indexes(player)))
+                self.assertEqual(board.count_legal_moves(player),
+                                 bitboard.count_legal_moves(player))
+                self.assertEqual(board.utility(player), bitboard.utility(player))
+            moves = board.get_legal_moves()
+            if not moves:
+                break
+            move = rng.choice(sorted(moves))
+            self.assertTrue(bitboard.move_is_legal(move))
+            board.apply_move(move)
+            bitboard.apply_move(move)
+
+    def test_matches_board(self):
+        for seed in range(20):
+            self.play_in_lockstep(seed)
+
+    def test_matches_board_rectangular(self):
+        for seed in range(5):
+            self.play_in_lockstep(seed, width=9, height=5)
+
+    def test_matches_board_large(self):
+        for seed in range(2):
+            self.play_in_lockstep(seed, width=25, height=25)
+
+    def test_forecast_move_does_not_modify_board(self):
+        game = isolation.BitBoard(self.player1, self.player2)
+        game.apply_move((3, 3))
+        child = game.forecast_move((0, 0))
+        self.assertEqual(game.get_player_location(self.player2), None)
+        self.assertEqual(child.get_player_location(self.player2), (0, 0))
+        self.assertEqual(game.move_count, 1)
+        self.assertNotEqual(game.hash(), child.hash())
+
+
+class IndexApiTest(unittest.TestCase):
+    """Check the flat cell index APIs against the coordinate APIs"""
+
+    def test_neighbor_table(self):
+        for width, height in [(7, 7), (9, 5), (3, 4)]:
+            table = isolation.Board.neighbor_table(width, height)
+            for idx, neighbors in enumerate(table):
+                r, c = idx % height, idx // height
+                expected = {(r + dr) + (c + dc) * height
+                            for dr, dc in [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                                           (1, -2), (1, 2), (2, -1), (2, 1)]
+                            if 0 <= r + dr < height and 0 <= c + dc < width}
+                self.assertEqual(expected, set(neighbors))
+
+    def test_matches_coordinates(self):
+        rng = random.Random(0)
+        game = isolation.Board("Player1", "Player2", 9, 5)
+        while True:
+            for player in ("Player1", "Player2"):
+                moves = game.get_legal_moves(player)
+                self.assertEqual(sorted(r + c * 5 for r, c in moves),
+                                 sorted(game.get_legal_move_indexes(player)))
+                self.assertEqual(len(moves), game.count_legal_moves(player))
+            self.assertEqual(len(game.get_blank_spaces()), game.count_blank_spaces())
+            if not game.get_legal_moves():
+                break
+            game.apply_move(rng.choice(sorted(game.get_legal_moves())))
+
+
+class BoardSnapshotTest(unittest.TestCase):
+    """Check that snapshots convert both ways with Board and BitBoard"""
+
+    def test_round_trip(self):
+        rng = random.Random(0)
+        for board_cls in (isolation.Board, isolation.BitBoard):
+            for width, height in [(7, 7), (9, 5)]:
+                game = board_cls("Player1", "Player2", width, height)
+                while game.get_legal_moves():
+                    snapshot = isolation.BoardSnapshot.from_board(game)
+                    for other_cls in (isolation.Board, isolation.BitBoard):
+                        copy = snapshot.to_board("Player1", "Player2", width,
+                                                 height, other_cls)
+                        self.assertEqual(game.to_string(), copy.to_string())
+                        self.assertEqual(game.hash(), copy.hash())
+                        self.assertEqual(game.move_count, copy.move_count)
+                        self.assertEqual(game.active_player, copy.active_player)
+                        self.assertEqual(sorted(game.get_legal_moves()),
+                                         sorted(copy.get_legal_moves()))
+                        self.assertEqual(snapshot,
+                                         isolation.BoardSnapshot.from_board(copy))
+                    game.apply_move(rng.choice(sorted(game.get_legal_moves())))
+
+    def test_transpositions_are_equal(self):
+        # The players swap their opening cells, which reaches the same
+        # blocked cells and player locations
+        game1 = isolation.Board("Player1", "Player2")
+        for move in [(0, 0), (3, 3), (1, 2), (2, 1)]:
+            game1.apply_move(move)
+        game2 = isolation.BitBoard("Player1", "Player2")
+        for move in [(3, 3), (0, 0), (1, 2), (2, 1)]:
+            game2.apply_move(move)
+        snapshot1 = isolation.BoardSnapshot.from_board(game1)
+        snapshot2 = isolation.BoardSnapshot.from_board(game2)
+        self.assertEqual(snapshot1, snapshot2)
+        self.assertEqual(hash(snapshot1), hash(snapshot2))
+        self.assertEqual(len({snapshot1, snapshot2}), 1)
+
+    def test_immutable(self):
+        snapshot = isolation.BoardSnapshot.from_board(
+            isolation.Board("Player1", "Player2"))
+        with self.assertRaises(AttributeError):
+            snapshot.blocked = 1
+        with self.assertRaises(AttributeError):
+            snapshot.extra = 1
+
+
+class BoardSymmetriesTest(unittest.TestCase):
+    """Check that symmetric positions share one canonical form"""
+
+    def play_mirrored(self, seed, width, height):
+        """Yield (game, image, t) for the positions of a random game and
+        their images under every symmetry, played with transformed moves.
+        """
+        rng = random.Random(seed)
+        symmetries = isolation.BoardSymmetries.of(width, height)
+        games = [isolation.Board("Player1", "Player2", width, height)
+                 for _ in range(len(symmetries))]
+        while games[0].get_legal_moves():
+            for t, image in enumerate(games):
+                yield games[0], image, t
+            move = rng.choice(sorted(games[0].get_legal_moves()))
+            for t, image in enumerate(games):
+                image.apply_move(symmetries.transform_move(move, t))
+
+    def test_images_share_canonical_form(self):
+        for width, height in [(7, 7), (9, 5)]:
+            symmetries = isolation.BoardSymmetries.of(width, height)
+            for game, image, t in self.play_mirrored(width, width, height):
+                snapshot = isolation.BoardSnapshot.from_board(game)
+                image_snapshot = isolation.BoardSnapshot.from_board(image)
+                self.assertEqual(symmetries.transform(snapshot, t), image_snapshot)
+                canonical, u = symmetries.canonical(image_snapshot)
+                self.assertEqual(canonical, symmetries.canonical(snapshot)[0])
+                self.assertEqual(symmetries.canonical_hash(image_snapshot)[0],
+                                 symmetries.canonical_hash(snapshot)[0])
+                self.assertEqual(canonical.zobrist_hash(width, height),
+                                 symmetries.canonical_hash(image_snapshot)[0])
+
+                # Moves map onto the legal moves of the canonical position
+                board = canonical.to_board("Player1", "Player2", width, height)
+                moves = image.get_legal_moves()
+                self.assertEqual(
+                    sorted(symmetries.transform_move(m, u) for m in moves),
+                    sorted(board.get_legal_moves()))
+                for m in moves:
+                    self.assertEqual(symmetries.inverse_transform_move(
+                        symmetries.transform_move(m, u), u), m)
+
+    def test_number_of_symmetries(self):
+        self.assertEqual(len(isolation.BoardSymmetries.of(7, 7)), 8)
+        self.assertEqual(len(isolation.BoardSymmetries.of(9, 5)), 4)
+        self.assertIs(isolation.BoardSymmetries.of(7, 7),
+                      isolation.BoardSymmetries.of(7, 7))
+        self.assertEqual(
+            isolation.BoardSymmetries.of(7, 7).transform_move((-1, -1), 3),
+            (-1, -1))
+
+
+class PushPopMoveTest(unittest.TestCase):
+    """Check that pop_move() exactly undoes push_move()"""
+
+    def check_undo(self, board_cls):
+        rng = random.Random(0)
+        game = board_cls("Player1", "Player2")
+        snapshots = []
+        while game.get_legal_moves():
+            snapshots.append((game.to_string(), game.hash(), game.move_count,
+                              game.active_player, sorted(game.get_legal_moves()),
+                              game.get_blank_spaces()))
+            game.push_move(rng.choice(sorted(game.get_legal_moves())))
+        while snapshots:
+            game.pop_move()
+            self.assertEqual(snapshots.pop(),
+                             (game.to_string(), game.hash(), game.move_count,
+                              game.active_player, sorted(game.get_legal_moves()),
+                              game.get_blank_spaces()))
+
+    def test_board(self):
+        self.check_undo(isolation.Board)
+
+    def test_bitboard(self):
+        self.check_undo(isolation.BitBoard)
+
+
+if __name__ == '__main__':
+    unittest.main()
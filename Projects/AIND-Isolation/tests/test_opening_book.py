@@ -0,0 +1,107 @@
+"""Unit tests for the opening book."""
+
+import os
+import tempfile
+import timeit
+import unittest
+
+import isolation
+import game_agent
+import opening_book
+import sample_players
+
+
+def time_left(limit=50.):
+    """Return a clock with `limit` milliseconds left. """
+    start = 1000 * timeit.default_timer()
+    return lambda: limit - (1000 * timeit.default_timer() - start)
+
+
+class OpeningBookTest(unittest.TestCase):
+    """Unit tests for building, saving and looking up opening books"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.book = opening_book.build_book(depth=3, search_depth=2)
+
+    def test_symmetric_positions_share_entries(self):
+        # 49 first moves fold into the 10 squares of one eighth of the board
+        first_moves = isolation.Board("Player1", "Player2").get_legal_moves()
+        keys = set()
+        for move in first_moves:
+            game = isolation.Board("Player1", "Player2")
+            game.apply_move(move)
+            keys.add(self.book.canonical_key(game)[0])
+        self.assertEqual(len(keys), 10)
+
+    def test_lookup_returns_legal_moves_in_symmetric_positions(self):
+        for first, second in [((0, 1), (4, 4)), ((1, 0), (4, 4)),
+                              ((6, 5), (2, 2)), ((5, 6), (2, 2))]:
+            game = isolation.Board("Player1", "Player2")
+            game.apply_move(first)
+            game.apply_move(second)
+            move = self.book.lookup(game)
+            self.assertIn(move, game.get_legal_moves())
+
+    def test_lookup_transforms_moves(self):
+        game = isolation.Board("Player1", "Player2")
+        game.apply_move((0, 1))
+        game.apply_move((4, 4))
+        mirrored = isolation.Board("Player1", "Player2")
+        mirrored.apply_move((1, 0))
+        mirrored.apply_move((4, 4))
+        move = self.book.lookup(game)
+        self.assertEqual(self.book.lookup(mirrored), (move[1], move[0]))
+
+    def test_save_and_load(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            self.book.save(path)
+            loaded = opening_book.OpeningBook.load(path)
+        finally:
+            os.remove(path)
+        self.assertEqual(loaded.entries, self.book.entries)
+        self.assertEqual((loaded.width, loaded.height), (7, 7))
+
+    def test_save_and_load_large_board(self):
+        # Cell indexes and player locations of a 17x17 board overflow a byte
+        book = opening_book.OpeningBook(17, 17)
+        games = []
+        for move in isolation.Board("Player1", "Player2", 17, 17).get_legal_moves():
+            game = isolation.Board("Player1", "Player2", 17, 17)
+            game.apply_move(move)
+            book.add(game, (16 - move[0], 16 - move[1]))
+            games.append(game)
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            book.save(path)
+            loaded = opening_book.OpeningBook.load(path)
+        finally:
+            os.remove(path)
+        self.assertEqual(loaded.entries, book.entries)
+        for game in games:
+            row, col = game.get_player_location("Player1")
+            self.assertEqual(loaded.lookup(game), (16 - row, 16 - col))
+
+    def test_book_player_falls_back_to_search(self):
+        player = opening_book.BookPlayer(game_agent.AlphaBetaPlayer(), self.book)
+        game = isolation.Board(player, "Player2")
+        self.assertIn(player.get_move(game, time_left()), game.get_legal_moves())
+        for move in [(3, 3), (0, 0), (1, 2), (2, 0)]:
+            game.apply_move(move)
+        before = game.to_string()
+        self.assertIn(player.get_move(game, time_left()), game.get_legal_moves())
+        self.assertEqual(before, game.to_string())
+
+    def test_book_player_plays_past_the_book(self):
+        player = opening_book.BookPlayer(game_agent.AlphaBetaPlayer(), self.book)
+        game = isolation.Board(player, sample_players.GreedyPlayer())
+        winner, history, termination = game.play(time_limit=50)
+        self.assertGreater(len(history), 3)
+        self.assertNotEqual(termination, "forfeit")
+
+
+if __name__ == '__main__':
+    unittest.main()
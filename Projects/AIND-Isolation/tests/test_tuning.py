@@ -0,0 +1,64 @@
+"""Unit tests for the heuristic tuning harness."""
+
+import os
+import random
+import tempfile
+import unittest
+
+import isolation
+import game_agent
+import tuning
+
+
+class WeightedScoreTest(unittest.TestCase):
+    """Check the parameterized heuristic"""
+
+    def test_defaults_match_custom_score(self):
+        score_fn = game_agent.WeightedScore()
+        rng = random.Random(0)
+        for _ in range(20):
+            game = isolation.Board("Player1", "Player2")
+            for _ in range(rng.randint(2, 30)):
+                moves = sorted(game.get_legal_moves())
+                if not moves:
+                    break
+                game.apply_move(rng.choice(moves))
+            for player in ("Player1", "Player2"):
+                self.assertEqual(score_fn(game, player),
+                                 game_agent.custom_score(game, player))
+
+
+class MatchTest(unittest.TestCase):
+    """Check the scoring of matches between weight sets"""
+
+    def test_stronger_weights_score_above_half(self):
+        # The default weights against their negation, which seeks the
+        # positions the defaults avoid, played in this process
+        rng = random.Random(0)
+        openings = tuning.random_openings(rng, 3)
+        strong = game_agent.WeightedScore().weights()
+        weak = {name: -weight for name, weight in strong.items()}
+        self.assertGreater(tuning.match(strong, weak, openings, 20, rng), 0.5)
+        self.assertLess(tuning.match(weak, strong, openings, 20, rng), 0.5)
+
+
+class TuningTest(unittest.TestCase):
+    """Check that tuning runs save and resume their progress"""
+
+    def test_checkpoint_and_resume(self):
+        path = os.path.join(tempfile.mkdtemp(), "tuning.json")
+        settings = dict(tuning.SETTINGS, pairs=1, time_limit=30)
+        state = tuning.tune(tuning.new_state(settings), path, iterations=1)
+        self.assertEqual(state["iteration"], 1)
+        self.assertEqual(tuning.load_checkpoint(path), state)
+        self.assertEqual(len(state["history"]), 1)
+        self.assertEqual(state["weights"]["own_moves"], 1.)
+
+        resumed = tuning.tune(tuning.load_checkpoint(path), path, iterations=2)
+        self.assertEqual(resumed["iteration"], 2)
+        self.assertEqual(resumed["history"][0], state["history"][0])
+        self.assertEqual(tuning.load_checkpoint(path), resumed)
+
+
+if __name__ == '__main__':
+    unittest.main()
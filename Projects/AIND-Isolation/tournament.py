@@ -11,17 +11,22 @@ players, and the players play each match twice -- once as the first player and
 once as the second player.  Randomizing the openings and switching the player
 order corrects for imbalances due to both starting position and initiative.
 """
+import argparse
 import itertools
+import multiprocessing
+import os
 import random
 import warnings
 
 from collections import namedtuple
 
 from isolation import Board
+from game_log import GameRecorder, GameLogWriter
 from sample_players import (RandomPlayer, open_move_score,
                             improved_score, center_score)
-from game_agent import (MinimaxPlayer, AlphaBetaPlayer, custom_score,
-                        custom_score_2, custom_score_3)
+from game_agent import (MinimaxPlayer, AlphaBetaPlayer, SearchStats,
+                        custom_score, custom_score_2, custom_score_3)
+from competition_agent import CustomPlayer
 
 NUM_MATCHES = 5  # number of matches against each opponent
 TIME_LIMIT = 150  # number of milliseconds before timeout
@@ -37,36 +42,131 @@ game_agent.py.
 Agent = namedtuple("Agent", ["player", "name"])
 
 
-def play_round(cpu_agent, test_agents, win_counts, num_matches):
+def available_cpus():
+    """Return the CPUs this process is allowed to run on. """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _pin_worker(next_cpu, cpus):
+    """Pool initializer that pins each worker process to its own CPU, so
+    that concurrent games never compete for a core and every agent gets the
+    full TIME_LIMIT of compute on each move.
+    """
+    with next_cpu.get_lock():
+        cpu = cpus[next_cpu.value % len(cpus)]
+        next_cpu.value += 1
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu})
+
+
+def make_pool(workers):
+    """Create a process pool with at most one pinned worker per available
+    CPU for playing games in parallel.
+    """
+    cpus = available_cpus()
+    if workers > len(cpus):
+        warnings.warn("Only {} CPUs are available; using {} workers instead "
+                      "of {}.".format(len(cpus), len(cpus), workers))
+        workers = len(cpus)
+    next_cpu = multiprocessing.Value("i", 0)
+    return multiprocessing.Pool(workers, initializer=_pin_worker,
+                                initargs=(next_cpu, cpus))
+
+
+def play_game(task):
+    """Play out a single game and return the index of the winner among the
+    (active, inactive) players at the start of the game, the reason the
+    game ended, the log record of the game if the task asks for one, and
+    the `MoveStats` of the moves of each player that collects them.
+
+    Each game reseeds the random module from the task, so results do not
+    depend on which process plays the game or in what order.
+    """
+    game, time_limit, seed, names, opening = task
+    random.seed(seed)
+    players = (game.active_player, game.inactive_player)
+    collectors = [getattr(player, "stats", None) for player in players]
+    starts = [len(c.moves) if c is not None else 0 for c in collectors]
+    recorder = None
+    if names is not None:
+        recorder = GameRecorder(game, names, opening, seed, time_limit)
+    winner, _, termination = game.play(
+        time_limit=time_limit,
+        on_move=recorder.on_move if recorder is not None else None)
+    record = recorder.finish(winner, termination) if recorder is not None else None
+
+    # Hand the statistics of this game to the caller rather than keeping
+    # them in the collectors, which may be copies in a worker process
+    move_stats = []
+    for collector, start in zip(collectors, starts):
+        move_stats.append(collector.moves[start:] if collector is not None else [])
+        if collector is not None:
+            del collector.moves[start:]
+    return players.index(winner), termination, record, move_stats
+
+
+def play_round(cpu_agent, test_agents, win_counts, num_matches, pool=None,
+               rng=random, log=None, stats=None):
     """Compare the test agents to the cpu agent in "fair" matches.
 
     "Fair" matches use random starting locations and force the agents to
     play as both first and second player to control for advantages resulting
     from choosing better opening moves or having first initiative to move.
+
+    Games are played in this process, or spread across the workers of
+    `pool` when one is given. The openings and the seed of each game are
+    drawn from `rng`. Every game is written to the `GameLogWriter` `log`
+    as soon as its result comes in, if one is given. The search statistics
+    of each player found in the dict `stats` are added to its `SearchStats`.
     """
     timeout_count = 0
     forfeit_count = 0
+    games = []
+    openings = []
     for _ in range(num_matches):
 
-        games = sum([[Board(cpu_agent.player, agent.player),
+        match = sum([[Board(cpu_agent.player, agent.player),
                       Board(agent.player, cpu_agent.player)]
                     for agent in test_agents], [])
 
         # initialize all games with a random move and response
+        opening = []
         for _ in range(2):
-            move = random.choice(games[0].get_legal_moves())
-            for game in games:
+            move = rng.choice(match[0].get_legal_moves())
+            opening.append(move)
+            for game in match:
                 game.apply_move(move)
-
-        # play all games and tally the results
-        for game in games:
-            winner, _, termination = game.play(time_limit=TIME_LIMIT)
-            win_counts[winner] += 1
-
-            if termination == "timeout":
-                timeout_count += 1
-            elif termination == "forfeit":
-                forfeit_count += 1
+        games.extend(match)
+        openings.extend([opening] * len(match))
+
+    # play all games and tally the results
+    names = None
+    if log is not None:
+        names = {agent.player: agent.name for agent in test_agents}
+        names[cpu_agent.player] = cpu_agent.name
+    players = [(game.active_player, game.inactive_player) for game in games]
+    tasks = [(game, TIME_LIMIT, rng.getrandbits(32), names, opening)
+             for game, opening in zip(games, openings)]
+    if pool is None:
+        results = map(play_game, tasks)
+    else:
+        results = pool.imap(play_game, tasks)
+
+    for (winner_idx, termination, record, move_stats), game_players in zip(results, players):
+        win_counts[game_players[winner_idx]] += 1
+        if log is not None:
+            log.write(record)
+        if stats is not None:
+            for player, moves in zip(game_players, move_stats):
+                if player in stats:
+                    stats[player].moves.extend(moves)
+
+        if termination == "timeout":
+            timeout_count += 1
+        elif termination == "forfeit":
+            forfeit_count += 1
 
     return timeout_count, forfeit_count
 
@@ -77,9 +177,15 @@ def update(total_wins, wins):
     return total_wins
 
 
-def play_matches(cpu_agents, test_agents, num_matches):
-    """Play matches between the test agent and each cpu_agent individually. """
+def play_matches(cpu_agents, test_agents, num_matches, pool=None, rng=random,
+                 log=None):
+    """Play matches between the test agent and each cpu_agent individually.
+    The search statistics of the test agents with a `SearchStats` collector
+    are aggregated over all games and printed at the end.
+    """
     total_wins = {agent.player: 0 for agent in test_agents}
+    stats = {agent.player: SearchStats() for agent in test_agents
+             if getattr(agent.player, "stats", None) is not None}
     total_timeouts = 0.
     total_forfeits = 0.
     total_matches = 2 * num_matches * len(cpu_agents)
@@ -93,7 +199,8 @@ def play_matches(cpu_agents, test_agents, num_matches):
 
         print("{!s:^9}{:^13}".format(idx + 1, agent.name), end="", flush=True)
 
-        counts = play_round(agent, test_agents, wins, num_matches)
+        counts = play_round(agent, test_agents, wins, num_matches, pool, rng,
+                            log, stats)
         total_timeouts += counts[0]
         total_forfeits += counts[1]
         total_wins = update(total_wins, wins)
@@ -123,9 +230,48 @@ def play_matches(cpu_agents, test_agents, num_matches):
         print(("\nYour agents forfeited {} games while there were still " +
                "legal moves available to play.\n").format(total_forfeits))
 
+    if stats:
+        print_stats([agent for agent in test_agents if agent.player in stats],
+                    stats)
+
+
+def print_stats(agents, stats):
+    """Print the aggregated search statistics of each agent. """
+    print("\nSearch statistics per move:")
+    print("{:<13}{:>7}{:>7}{:>10}{:>8}{:>9}{:>10}  {}".format(
+        "Agent", "Depth", "Max", "Nodes", "Score", "Movegen", "Margin",
+        "Cutoffs by ply"))
+    for agent in agents:
+        summary = stats[agent.player].summary()
+        if summary is None:
+            continue
+        print("{:<13}{:>7.2f}{:>7}{:>10.0f}{:>7.1f}%{:>8.1f}%{:>10.1f}  {}".format(
+            agent.name, summary["mean_depth"], summary["max_depth"],
+            summary["mean_nodes"], 100 * summary["score_fraction"],
+            100 * summary["movegen_fraction"], summary["min_margin"],
+            " ".join(str(c) for c in summary["cutoffs_by_ply"][:8])))
+
 
 def main():
 
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of games to play in parallel, each in "
+                             "its own process pinned to one CPU")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed for the openings and per-game random seeds")
+    parser.add_argument("--log", metavar="PATH",
+                        help="append every game to this JSON lines game log "
+                             "(see game_log.py)")
+    parser.add_argument("--mcts", action="store_true",
+                        help="also enter the Monte Carlo Tree Search agent "
+                             "from competition_agent.py as a test agent")
+    parser.add_argument("--stats", action="store_true",
+                        help="collect and print the search statistics of the "
+                             "test agents")
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
     # Define two agents to compare -- these agents will play from the same
     # starting position against the same adversaries in the tournament
     test_agents = [
@@ -134,6 +280,12 @@ def main():
         Agent(AlphaBetaPlayer(score_fn=custom_score_2), "AB_Custom_2"),
         Agent(AlphaBetaPlayer(score_fn=custom_score_3), "AB_Custom_3")
     ]
+    if args.mcts:
+        test_agents.append(Agent(CustomPlayer(timeout=10.), "MCTS"))
+    if args.stats:
+        for agent in test_agents:
+            if hasattr(agent.player, "stats"):
+                agent.player.stats = SearchStats()
 
     # Define a collection of agents to compete against the test agents
     cpu_agents = [
@@ -150,7 +302,17 @@ def main():
     print("{:^74}".format("*************************"))
     print("{:^74}".format("Playing Matches"))
     print("{:^74}".format("*************************"))
-    play_matches(cpu_agents, test_agents, NUM_MATCHES)
+    log = GameLogWriter(args.log) if args.log else None
+    try:
+        if args.workers > 1:
+            with make_pool(args.workers) as pool:
+                play_matches(cpu_agents, test_agents, NUM_MATCHES, pool, rng,
+                             log)
+        else:
+            play_matches(cpu_agents, test_agents, NUM_MATCHES, rng=rng, log=log)
+    finally:
+        if log is not None:
+            log.close()
 
 
 if __name__ == "__main__":
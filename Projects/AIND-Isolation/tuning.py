@@ -0,0 +1,230 @@
+"""Tune the weights of the `WeightedScore` heuristic by self-play with
+simultaneous perturbation stochastic approximation (SPSA).
+
+Every iteration moves all tuned weights at once by a random +/- step, plays
+a batch of games between an alpha-beta agent with the weights stepped one
+way and an agent with the weights stepped the other way, and moves the
+weights toward the side that won more games. Each batch plays pairs of games
+from random openings with both agents taking each side, as in tournament.py,
+and the games are spread across a pool of worker processes with --workers.
+
+The `own_moves` weight stays at 1 and sets the scale of the other weights,
+since scaling all weights together does not change which move is best.
+
+Progress is written to a JSON checkpoint after every iteration. Running the
+script again with the same checkpoint resumes the run where it stopped, with
+the settings it was started with. --validate plays a final match between the
+tuned weights and the starting weights to measure the improvement.
+
+Example:
+
+    python tuning.py --minutes 30 --workers 8 --validate 200
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+
+from isolation import Board
+from game_agent import AlphaBetaPlayer, WeightedScore
+from tournament import make_pool, play_game
+
+CHECKPOINT = "tuning.json"
+TUNED = ("opp_moves", "mirror_distance", "knight_distance")
+
+# Default SPSA settings. The gain sequences follow Spall's recommended
+# exponents; the step size `a` and perturbation `c` suit weights of order 1
+SETTINGS = {
+    "a": 0.5,  # step size of the weight updates
+    "c": 0.25,  # size of the weight perturbations
+    "A": 10,  # stability offset of the step size sequence
+    "alpha": 0.602,  # decay exponent of the step size
+    "gamma": 0.101,  # decay exponent of the perturbations
+    "pairs": 8,  # pairs of games played in each iteration
+    "time_limit": 100,  # milliseconds per move
+    "seed": 0,
+}
+
+
+def new_state(settings, weights=None):
+    """Return the state of a new tuning run starting from `weights` (the
+    `WeightedScore` defaults if not given).
+    """
+    return {
+        "settings": dict(settings),
+        "iteration": 0,
+        "weights": dict(weights or WeightedScore().weights()),
+        "initial_weights": dict(weights or WeightedScore().weights()),
+        "history": [],
+    }
+
+
+def load_checkpoint(path):
+    """Return the tuning state saved at `path`, or None if there is none. """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, state):
+    """Write the tuning state to `path`, replacing the previous checkpoint
+    only once the new one is complete.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def random_openings(rng, count, width=7, height=7):
+    """Return `count` random openings of one move for each player. """
+    openings = []
+    for _ in range(count):
+        game = Board("Player1", "Player2", width, height)
+        opening = []
+        for _ in range(2):
+            move = rng.choice(sorted(game.get_legal_moves()))
+            game.apply_move(move)
+            opening.append(move)
+        openings.append(opening)
+    return openings
+
+
+def match(weights_a, weights_b, openings, time_limit, rng, pool=None):
+    """Play two games from each opening between alpha-beta agents using the
+    `WeightedScore` weights `weights_a` and `weights_b`, with each agent
+    moving first once, and return the fraction of the games won by the
+    agent with `weights_a`.
+    """
+    player_a = AlphaBetaPlayer(score_fn=WeightedScore(**weights_a))
+    player_b = AlphaBetaPlayer(score_fn=WeightedScore(**weights_b))
+    tasks = []
+    for opening in openings:
+        for players in ((player_a, player_b), (player_b, player_a)):
+            game = Board(*players)
+            for move in opening:
+                game.apply_move(move)
+            tasks.append((game, time_limit, rng.getrandbits(32), None, opening))
+    # Games played in this process are played on the task boards, so the
+    # player moving first is read before any game starts
+    first_players = [task[0].active_player for task in tasks]
+    results = map(play_game, tasks) if pool is None else pool.map(play_game, tasks)
+
+    wins = 0
+    for first_player, (winner_idx, _, _, _) in zip(first_players, results):
+        wins += (winner_idx == 0) == (first_player is player_a)
+    return wins / len(tasks)
+
+
+def spsa_iteration(state, pool=None):
+    """Run one SPSA iteration, updating `state` in place, and return the
+    record of the iteration added to its history.
+    """
+    settings = state["settings"]
+    k = state["iteration"]
+    # Each iteration draws from its own seed, so resumed runs play the
+    # same games as uninterrupted ones
+    rng = random.Random(settings["seed"] * 1000003 + k)
+    a_k = settings["a"] / (k + 1 + settings["A"]) ** settings["alpha"]
+    c_k = settings["c"] / (k + 1) ** settings["gamma"]
+
+    weights = state["weights"]
+    delta = {name: rng.choice((-1, 1)) for name in TUNED}
+    plus = dict(weights, **{n: weights[n] + c_k * d for n, d in delta.items()})
+    minus = dict(weights, **{n: weights[n] - c_k * d for n, d in delta.items()})
+
+    openings = random_openings(rng, settings["pairs"])
+    score = match(plus, minus, openings, settings["time_limit"], rng, pool)
+
+    # The result of the match, from -1 (minus won every game) to 1 (plus
+    # won every game), estimates the slope along the perturbation
+    result = 2 * score - 1
+    for name, d in delta.items():
+        weights[name] += a_k * result / (2 * c_k * d)
+
+    record = {"iteration": k, "score": score, "weights": dict(weights)}
+    state["history"].append(record)
+    state["iteration"] = k + 1
+    return record
+
+
+def tune(state, checkpoint, iterations=None, minutes=None, pool=None,
+         progress=None):
+    """Run SPSA iterations on `state` until the run has done `iterations`
+    iterations in total or `minutes` have passed, saving a checkpoint after
+    each one. Call `progress(record)` after each iteration if given.
+    """
+    deadline = time.time() + 60 * minutes if minutes is not None else math.inf
+    while time.time() < deadline:
+        if iterations is not None and state["iteration"] >= iterations:
+            break
+        record = spsa_iteration(state, pool)
+        save_checkpoint(checkpoint, state)
+        if progress is not None:
+            progress(record)
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--checkpoint", default=CHECKPOINT,
+                        help="JSON file the run is saved to and resumed from")
+    parser.add_argument("--minutes", type=float,
+                        help="stop after this many minutes")
+    parser.add_argument("--iterations", type=int,
+                        help="stop once the run has done this many iterations")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of games to play in parallel")
+    parser.add_argument("--pairs", type=int, default=SETTINGS["pairs"],
+                        help="pairs of games per iteration (new runs only)")
+    parser.add_argument("--time-limit", type=int, default=SETTINGS["time_limit"],
+                        help="milliseconds per move (new runs only)")
+    parser.add_argument("--seed", type=int, default=SETTINGS["seed"],
+                        help="seed of the run (new runs only)")
+    parser.add_argument("--validate", type=int, default=0, metavar="PAIRS",
+                        help="finally play this many pairs of games between "
+                             "the tuned and the initial weights")
+    args = parser.parse_args()
+    if args.minutes is None and args.iterations is None:
+        parser.error("give --minutes or --iterations")
+
+    state = load_checkpoint(args.checkpoint)
+    if state is None:
+        settings = dict(SETTINGS, pairs=args.pairs, time_limit=args.time_limit,
+                        seed=args.seed)
+        state = new_state(settings)
+    else:
+        print("Resuming {} at iteration {}".format(args.checkpoint,
+                                                   state["iteration"]))
+
+    def progress(record):
+        print("iteration {:>4}  plus won {:>5.1%}  {}".format(
+            record["iteration"], record["score"], ", ".join(
+                "{}={:.3f}".format(n, record["weights"][n]) for n in TUNED)))
+
+    pool = make_pool(args.workers) if args.workers > 1 else None
+    try:
+        tune(state, args.checkpoint, args.iterations, args.minutes, pool,
+             progress)
+        print("Tuned weights: {!r}".format(WeightedScore(**state["weights"])))
+
+        if args.validate:
+            settings = state["settings"]
+            rng = random.Random(settings["seed"] - 1)
+            openings = random_openings(rng, args.validate)
+            score = match(state["weights"], state["initial_weights"], openings,
+                          settings["time_limit"], rng, pool)
+            games = 2 * args.validate
+            margin = 2 * math.sqrt(score * (1 - score) / games)
+            print("Tuned weights won {:.1%} (+/- {:.1%}) of {} games against "
+                  "the initial weights".format(score, margin, games))
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+if __name__ == "__main__":
+    main()
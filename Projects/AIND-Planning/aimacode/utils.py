@@ -579,33 +579,50 @@ class PriorityQueue(Queue):
     order) is returned first.  Also supports dict-like lookup.
 
     MODIFIED FROM AIMA VERSION
-        - Use heapq & an additional dict to track membership
-        - remove __delitem__ (it is not strictly required)
+        - Use heapq & an additional dict mapping each item to its heap
+          entry, for O(1) membership and lookup
+        - Deleting an item only marks its entry as removed; removed entries
+          are skipped by pop() and dropped when they make up more than half
+          of the heap, so deleting and re-appending an item with a lower
+          priority works as a decrease-key
     """
 
     def __init__(self, order=None, f=lambda x: x):
         self._queue = []
-        self._members = defaultdict(lambda: 0)
+        self._entries = {}
         self.priorityFn = f
 
     def __len__(self):
-        return len(self._members)
+        return len(self._entries)
 
     def __contains__(self, item):
-        return self._members[item] > 0
+        return item in self._entries
 
     def __getitem__(self, key):
-        if self._members[key] > 0:
-            return key
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry[1]
+
+    def __delitem__(self, key):
+        entry = self._entries.pop(key)
+        entry[2] = False
+        if len(self._queue) > 2 * len(self._entries) + 16:
+            self._queue = [e for e in self._queue if e[2]]
+            heapq.heapify(self._queue)
 
     def append(self, item):
-        heapq.heappush(self._queue, (self.priorityFn(item), item))
-        self._members[item] += 1
+        if item in self._entries:
+            del self[item]
+        entry = [self.priorityFn(item), item, True]
+        self._entries[item] = entry
+        heapq.heappush(self._queue, entry)
 
     def pop(self):
-        _, item = heapq.heappop(self._queue)
-        self._members[item] -= 1
-        return item
+        while True:
+            _, item, live = heapq.heappop(self._queue)
+            if live:
+                del self._entries[item]
+                return item
 
 
 # ______________________________________________________________________________
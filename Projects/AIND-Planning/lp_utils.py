@@ -42,24 +42,58 @@ def encode_state(fs: FluentState, fluent_map: list) -> str:
     :return: str eg. "TFFTFT" string of mapped positive and negative fluents
     """
     state_tf = []
+    pos = set(fs.pos)
     for fluent in fluent_map:
-        if fluent in fs.pos:
+        if fluent in pos:
             state_tf.append('T')
         else:
             state_tf.append('F')
     return "".join(state_tf)
 
 
-def decode_state(state: str, fluent_map: list) -> FluentState:
-    """ decode string of T/F as fluent per mapping
+def encode_fluents(fluents: list, fluent_map: list) -> int:
+    """ encode a list of fluents as an integer bitset using mapping
 
-    :param state: str eg. "TFFTFT" string of mapped positive and negative fluents
+    :param fluents: list of fluents
+    :param fluent_map: ordered list of possible fluents for the problem
+    :return: int with bit i set if fluent_map[i] is in fluents
+    """
+    fluents = set(fluents)
+    bits = 0
+    for idx, fluent in enumerate(fluent_map):
+        if fluent in fluents:
+            bits |= 1 << idx
+    return bits
+
+
+def encode_state_bits(fs: FluentState, fluent_map: list) -> int:
+    """ encode fluents to an integer bitset using mapping
+
+    :param fs: FluentState object
+    :param fluent_map: ordered list of possible fluents for the problem
+    :return: int eg. 0b101001 with bit i set if fluent_map[i] is positive
+    """
+    return encode_fluents(fs.pos, fluent_map)
+
+
+def decode_state(state, fluent_map: list) -> FluentState:
+    """ decode string of T/F, or integer bitset, as fluent per mapping
+
+    :param state: str eg. "TFFTFT" string of mapped positive and negative fluents,
+        or int bitset as returned by encode_state_bits
     :param fluent_map: ordered list of possible fluents for the problem
     :return: fs: FluentState object
 
     lengths of state string and fluent_map list must be the same
     """
     fs = FluentState([], [])
+    if isinstance(state, int):
+        for idx, fluent in enumerate(fluent_map):
+            if state >> idx & 1:
+                fs.pos.append(fluent)
+            else:
+                fs.neg.append(fluent)
+        return fs
     for idx, char in enumerate(state):
         if char == 'T':
             fs.pos.append(fluent_map[idx])
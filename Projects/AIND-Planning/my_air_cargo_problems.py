@@ -1,13 +1,12 @@
-from aimacode.logic import PropKB
 from aimacode.planning import Action
 from aimacode.search import (
     Node, Problem,
 )
 from aimacode.utils import expr
 from lp_utils import (
-    FluentState, encode_state, decode_state,
+    FluentState, encode_state_bits,
 )
-from my_planning_graph import PlanningGraph
+from my_planning_graph import RelaxedPlanningGraph
 
 from functools import lru_cache
 
@@ -26,14 +25,34 @@ class AirCargoProblem(Problem):
             positive and negative literal fluents (as expr) describing initial state
         :param goal: list of expr
             literal fluents required for goal test
+
+        States are integer bitsets, where bit i is set when the fluent
+        state_map[i] is true (see lp_utils.encode_state_bits). Each action is
+        compiled into bitmasks of its preconditions and effects, so testing
+        and applying actions takes a few integer operations.
+
+        The applicable actions of a state are found through an inverted
+        index from each fluent to the actions with a precondition on it,
+        kept as bitmasks over the positions in actions_list: the actions
+        needing a fluent that is false, or needing a fluent to be false
+        that is true, are blocked. The index is folded into one table per
+        byte of the state (see index_preconditions), so a state takes one
+        lookup per byte instead of one test per candidate action.
         """
         self.state_map = initial.pos + initial.neg
-        self.initial_state_TF = encode_state(initial, self.state_map)
-        Problem.__init__(self, self.initial_state_TF, goal=goal)
+        self.initial_state_bits = encode_state_bits(initial, self.state_map)
+        Problem.__init__(self, self.initial_state_bits, goal=goal)
         self.cargos = cargos
         self.planes = planes
         self.airports = airports
         self.actions_list = self.get_actions()
+        self.fluent_index = {fluent: idx for idx, fluent in enumerate(self.state_map)}
+        self.goal_mask = self.fluent_mask(goal)
+        self.action_masks = {action: self.compile_action(action)
+                             for action in self.actions_list}
+        self.actions_needing_true, self.actions_needing_false = self.index_precondition_fluents()
+        self.blocked_tables = self.index_preconditions()
+        self.planning_graph = RelaxedPlanningGraph(self)
 
     def get_actions(self):
         """
@@ -119,38 +138,103 @@ class AirCargoProblem(Problem):
 
         return load_actions() + unload_actions() + fly_actions()
 
-    def actions(self, state: str) -> list:
+    def fluent_mask(self, fluents: list) -> int:
+        """ Return the bitmask of a list of fluents of the problem.
+
+        :param fluents: list of expr
+        :return: int
+        """
+        mask = 0
+        for fluent in fluents:
+            mask |= 1 << self.fluent_index[fluent]
+        return mask
+
+    def compile_action(self, action: Action) -> tuple:
+        """ Return the bitmasks (precond_pos, precond_neg, effect_add,
+        effect_rem) of the fluents in the preconditions and effects of an action.
+
+        :param action: Action
+        :return: tuple of int
+        """
+        return (self.fluent_mask(action.precond_pos),
+                self.fluent_mask(action.precond_neg),
+                self.fluent_mask(action.effect_add),
+                self.fluent_mask(action.effect_rem))
+
+    def index_precondition_fluents(self):
+        """ Return the inverted index from fluents to the actions with a
+        precondition on them.
+
+        :return: (list of int, list of int)
+            for each fluent index, the bitmask over positions in
+            actions_list of the actions with the fluent in precond_pos, and
+            of those with the fluent in precond_neg
+        """
+        actions_needing_true = [0] * len(self.state_map)
+        actions_needing_false = [0] * len(self.state_map)
+        for order, action in enumerate(self.actions_list):
+            for fluent in action.precond_pos:
+                actions_needing_true[self.fluent_index[fluent]] |= 1 << order
+            for fluent in action.precond_neg:
+                actions_needing_false[self.fluent_index[fluent]] |= 1 << order
+        return actions_needing_true, actions_needing_false
+
+    def index_preconditions(self):
+        """ Return one pair of tables per byte of the state bitset, mapping
+        the value of the byte to the actions it blocks: the first table is
+        indexed by the byte of the false fluents, the second by the byte of
+        the true fluents.
+
+        :return: list of (list of int, list of int)
+        """
+        num_fluents = len(self.state_map)
+        blocked_tables = []
+        for start in range(0, num_fluents, 8):
+            by_false = [0] * 256
+            by_true = [0] * 256
+            for byte in range(1, 256):
+                low_bit = (byte & -byte).bit_length() - 1
+                if start + low_bit < num_fluents:
+                    fluent = start + low_bit
+                    rest = byte & (byte - 1)
+                    by_false[byte] = by_false[rest] | self.actions_needing_true[fluent]
+                    by_true[byte] = by_true[rest] | self.actions_needing_false[fluent]
+            blocked_tables.append((by_false, by_true))
+        return blocked_tables
+
+    def applicable_mask(self, state: int) -> int:
+        """ Return the bitmask over positions in actions_list of the actions
+        that can be executed in the given state.
+
+        :param state: int
+        :return: int
+        """
+        false = ~state
+        blocked = 0
+        for by_false, by_true in self.blocked_tables:
+            blocked |= by_false[false & 0xff] | by_true[state & 0xff]
+            false >>= 8
+            state >>= 8
+        return ~blocked & ((1 << len(self.actions_list)) - 1)
+
+    def actions(self, state: int) -> list:
         """ Return the actions that can be executed in the given state.
 
-        :param state: str
-            state represented as T/F string of mapped fluents (state variables)
-            e.g. 'FTTTFF'
+        :param state: int
+            state represented as a bitset of mapped fluents (state variables)
+            e.g. 0b011100
         :return: list of Action objects
         """
-        # TODO implement
         possible_actions = []
-        kb = PropKB()
-        kb.tell(decode_state(state, self.state_map).pos_sentence())
-        for action in self.actions_list:
-            is_possible = True
-            for clause in action.precond_pos:
-                if clause not in kb.clauses:
-                    is_possible = False
-                    # action is not possible, break from the loop
-                    break
-            if not is_possible:
-                # action is not possible, skip the run and check another action instead
-                continue
-            for clause in action.precond_neg:
-                if clause in kb.clauses:
-                    is_possible = False
-                    # action is not possbile, break from the loop
-                    break
-            if is_possible:
-                possible_actions.append(action)
+        actions_list = self.actions_list
+        mask = self.applicable_mask(state)
+        while mask:
+            bit = mask & -mask
+            possible_actions.append(actions_list[bit.bit_length() - 1])
+            mask ^= bit
         return possible_actions
 
-    def result(self, state: str, action: Action):
+    def result(self, state: int, action: Action):
         """ Return the state that results from executing the given
         action in the given state. The action must be one of
         self.actions(state).
@@ -159,35 +243,19 @@ class AirCargoProblem(Problem):
         :param action: Action applied
         :return: resulting state after action
         """
-        # TODO implement
-        new_state = FluentState([], [])
-        old_state = decode_state(state, self.state_map)
-        for s in old_state.pos:
-            if s not in action.effect_rem:
-                new_state.pos.append(s)
-        for s in action.effect_add:
-            if s not in new_state.pos:
-                new_state.pos.append(s)
-        for s in old_state.neg:
-            if s not in action.effect_add:
-                new_state.neg.append(s)
-        for s in action.effect_rem:
-            if s not in new_state.neg:
-                new_state.neg.append(s)
-        return encode_state(new_state, self.state_map)
-
-    def goal_test(self, state: str) -> bool:
+        masks = self.action_masks.get(action)
+        if masks is None:
+            masks = self.compile_action(action)
+        _, _, effect_add, effect_rem = masks
+        return (state & ~effect_rem) | effect_add
+
+    def goal_test(self, state: int) -> bool:
         """ Test the state to see if goal is reached
 
-        :param state: str representing state
+        :param state: int representing state
         :return: bool
         """
-        kb = PropKB()
-        kb.tell(decode_state(state, self.state_map).pos_sentence())
-        for clause in self.goal:
-            if clause not in kb.clauses:
-                return False
-        return True
+        return state & self.goal_mask == self.goal_mask
 
     def h_1(self, node: Node):
         # note that this is not a true heuristic
@@ -200,11 +268,12 @@ class AirCargoProblem(Problem):
         state space to estimate the sum of all actions that must be carried
         out from the current state in order to satisfy each individual goal
         condition.
+
+        The levels are propagated on the relaxed planning graph built once
+        for the problem, which gives the same sum as
+        PlanningGraph(self, node.state).h_levelsum().
         """
-        # requires implemented PlanningGraph class
-        pg = PlanningGraph(self, node.state)
-        pg_levelsum = pg.h_levelsum()
-        return pg_levelsum
+        return self.planning_graph.h_levelsum(node.state)
 
     @lru_cache(maxsize=8192)
     def h_ignore_preconditions(self, node: Node):
@@ -214,13 +283,8 @@ class AirCargoProblem(Problem):
         executed.
         """
         # TODO implement (see Russell-Norvig Ed-3 10.2.3  or Russell-Norvig Ed-2 11.2)
-        count = len(self.goal)
-        node_state = node.state
-        pos_list = decode_state(node_state, self.state_map).pos
-        for clause in self.goal:
-            if clause in pos_list:
-                count -= 1
-        return count
+        # count the goal fluents that are not yet true
+        return bin(self.goal_mask & ~node.state).count("1")
 
 
 def air_cargo_p1() -> AirCargoProblem:
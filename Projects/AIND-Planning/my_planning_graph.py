@@ -1,7 +1,9 @@
 from aimacode.planning import Action
 from aimacode.search import Problem
 from aimacode.utils import expr, Expr
-from lp_utils import decode_state
+from lp_utils import decode_state, encode_state_bits
+
+from functools import lru_cache
 
 
 class PgNode():
@@ -535,3 +537,103 @@ class PlanningGraph():
                     level_sum += level
                     break
         return level_sum
+
+
+class RelaxedPlanningGraph():
+    """
+    The literal levels of the planning graphs of one problem, computed from
+    any state without building the graph.
+
+    The level sum heuristic only needs the first S level of each goal
+    literal, and an action enters an A level as soon as its preconditions
+    are in the previous S level, whatever their mutexes. So the S levels
+    of a PlanningGraph can be propagated on bitsets of the positive and
+    negative literals: the actions are compiled into precondition and
+    effect masks once per problem, the no-op actions become the
+    persistence of the literal masks from one level to the next, and each
+    state only costs the propagation of its levels.
+    """
+
+    def __init__(self, problem: Problem):
+        """
+        :param problem: PlanningProblem (or subclass such as AirCargoProblem or HaveCakeProblem)
+        Instance variable calculated:
+            fluent_index: dict of the bit index of each fluent, starting with problem.state_map
+            action_masks: list of (precond_pos, precond_neg, effect_add, effect_rem) bitmasks of the
+                problem actions
+            goal_bits: list of the bit of each problem goal
+        """
+        self.problem = problem
+        self.state_map = problem.state_map
+        self.fluent_index = {fluent: idx for idx, fluent in enumerate(self.state_map)}
+        self.action_masks = [(self.fluent_mask(a.precond_pos), self.fluent_mask(a.precond_neg),
+                              self.fluent_mask(a.effect_add), self.fluent_mask(a.effect_rem))
+                             for a in problem.actions_list]
+        self.goal_bits = [self.fluent_mask([goal]) for goal in problem.goal]
+        # fluents outside state_map are neither true nor false in S0
+        self.state_bits = (1 << len(self.state_map)) - 1
+
+    def fluent_mask(self, fluents) -> int:
+        """ return the bitmask of a list of fluents, giving new fluents the next free bits
+
+        :param fluents: list of expr
+        :return: int
+        """
+        mask = 0
+        for fluent in fluents:
+            idx = self.fluent_index.setdefault(fluent, len(self.fluent_index))
+            mask |= 1 << idx
+        return mask
+
+    def state_mask(self, state) -> int:
+        """ return the bitset of the true fluents of a state
+
+        :param state: int bitset as returned by lp_utils.encode_state_bits, or str of T/F
+        :return: int
+        """
+        if isinstance(state, int):
+            return state
+        return encode_state_bits(decode_state(state, self.state_map), self.state_map)
+
+    def literal_levels(self, state):
+        """ yield the positive and negative literal masks (pos, neg) of each S level of the
+        planning graph of a state, until the graph levels off
+
+        :param state: int or str state of the problem
+        """
+        pos = self.state_mask(state)
+        neg = ~pos & self.state_bits
+        pending = self.action_masks
+        while True:
+            yield pos, neg
+            next_pos, next_neg = pos, neg
+            waiting = []
+            for masks in pending:
+                precond_pos, precond_neg, effect_add, effect_rem = masks
+                if pos & precond_pos == precond_pos and neg & precond_neg == precond_neg:
+                    # the action is in every later A level, so its effects persist
+                    next_pos |= effect_add
+                    next_neg |= effect_rem
+                else:
+                    waiting.append(masks)
+            if next_pos == pos and next_neg == neg:
+                return
+            pos, neg, pending = next_pos, next_neg, waiting
+
+    @lru_cache(maxsize=65536)
+    def h_levelsum(self, state) -> int:
+        """The sum of the level costs of the individual goals (admissible if goals independent),
+        equal to PlanningGraph(problem, state).h_levelsum()
+
+        :param state: int or str state of the problem
+        :return: int
+        """
+        level_sum = 0
+        missing = self.goal_bits
+        for level, (pos, _) in enumerate(self.literal_levels(state)):
+            still_missing = [goal for goal in missing if not pos & goal]
+            level_sum += level * (len(missing) - len(still_missing))
+            missing = still_missing
+            if not missing:
+                break
+        return level_sum
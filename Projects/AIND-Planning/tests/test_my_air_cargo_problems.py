@@ -5,7 +5,7 @@ import unittest
 from aimacode.planning import Action
 from aimacode.utils import expr
 from aimacode.search import Node
-from lp_utils import decode_state
+from lp_utils import FluentState, decode_state, encode_state_bits
 
 from my_air_cargo_problems import (
     air_cargo_p1, air_cargo_p2, air_cargo_p3,
@@ -17,7 +17,7 @@ class TestAirCargoProb1(unittest.TestCase):
         self.p1 = air_cargo_p1()
 
     def test_ACP1_num_fluents(self):
-        self.assertEqual(len(self.p1.initial), 12)
+        self.assertEqual(len(self.p1.state_map), 12)
 
     def test_ACP1_num_requirements(self):
         self.assertEqual(len(self.p1.goal),2)
@@ -29,7 +29,7 @@ class TestAirCargoProb2(unittest.TestCase):
         self.p2 = air_cargo_p2()
 
     def test_ACP2_num_fluents(self):
-        self.assertEqual(len(self.p2.initial), 27)
+        self.assertEqual(len(self.p2.state_map), 27)
 
     def test_ACP2_num_requirements(self):
         self.assertEqual(len(self.p2.goal),3)
@@ -41,7 +41,7 @@ class TestAirCargoProb3(unittest.TestCase):
         self.p3 = air_cargo_p3()
 
     def test_ACP3_num_fluents(self):
-        self.assertEqual(len(self.p3.initial), 32)
+        self.assertEqual(len(self.p3.state_map), 32)
 
     def test_ACP3_num_requirements(self):
         self.assertEqual(len(self.p3.goal),4)
@@ -71,11 +71,42 @@ class TestAirCargoMethods(unittest.TestCase):
         #     print("{}{}".format(action.name, action.args))
         self.assertEqual(len(self.p1.actions(self.p1.initial)), 4)
 
+    def test_AC_actions_match_preconditions(self):
+        # the indexed actions must be exactly the actions of actions_list
+        # whose preconditions hold, in the same order
+        p2 = air_cargo_p2()
+        state = p2.initial
+        for step in range(20):
+            fs = decode_state(state, p2.state_map)
+            expected = [a for a in p2.actions_list
+                        if all(c in fs.pos for c in a.precond_pos) and
+                        not any(c in fs.pos for c in a.precond_neg)]
+            actions = p2.actions(state)
+            self.assertEqual(actions, expected)
+            state = p2.result(state, actions[step % len(actions)])
+
+    def test_AC_precondition_index(self):
+        fluent = self.p1.fluent_index[expr('At(P1, SFO)')]
+        expected = [a for a in self.p1.actions_list if expr('At(P1, SFO)') in a.precond_pos]
+        mask = self.p1.actions_needing_true[fluent]
+        self.assertEqual([a for i, a in enumerate(self.p1.actions_list) if mask >> i & 1],
+                         expected)
+        self.assertEqual(self.p1.actions_needing_false[fluent], 0)
+
     def test_AC_result(self):
         fs = decode_state(self.p1.result(self.p1.initial, self.act1), self.p1.state_map)
         self.assertTrue(expr('In(C1, P1)') in fs.pos)
         self.assertTrue(expr('At(C1, SFO)') in fs.neg)
 
+    def test_AC_state_bits(self):
+        fs = decode_state(self.p1.initial, self.p1.state_map)
+        self.assertEqual(fs.pos, self.p1.state_map[:4])
+        self.assertEqual(fs.neg, self.p1.state_map[4:])
+        self.assertEqual(encode_state_bits(fs, self.p1.state_map), self.p1.initial)
+        self.assertFalse(self.p1.goal_test(self.p1.initial))
+        goal = FluentState(self.p1.goal, [])
+        self.assertTrue(self.p1.goal_test(encode_state_bits(goal, self.p1.state_map)))
+
     def test_h_ignore_preconditions(self):
         n = Node(self.p1.initial)
         self.assertEqual(self.p1.h_ignore_preconditions(n),2)
@@ -5,9 +5,10 @@ import unittest
 from aimacode.utils import expr
 from aimacode.planning import Action
 from example_have_cake import have_cake
+from my_air_cargo_problems import air_cargo_p1
 
 from my_planning_graph import (
-    PlanningGraph, PgNode_a, PgNode_s, mutexify
+    PlanningGraph, PgNode_a, PgNode_s, RelaxedPlanningGraph, mutexify
 )
 
 
@@ -122,6 +123,18 @@ class TestPlanningGraphHeuristics(unittest.TestCase):
     def test_levelsum(self):
         self.assertEqual(self.pg.h_levelsum(), 1)
 
+    def test_relaxed_levelsum(self):
+        self.assertEqual(RelaxedPlanningGraph(self.p).h_levelsum(self.p.initial), 1)
+        # the relaxed graph must match the planning graph along a path
+        p1 = air_cargo_p1()
+        rpg = RelaxedPlanningGraph(p1)
+        state = p1.initial
+        for step in range(12):
+            self.assertEqual(rpg.h_levelsum(state),
+                             PlanningGraph(p1, state).h_levelsum())
+            actions = p1.actions(state)
+            state = p1.result(state, actions[step % len(actions)])
+
 
 if __name__ == '__main__':
     unittest.main()
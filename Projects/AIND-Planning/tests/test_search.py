@@ -0,0 +1,58 @@
+import unittest
+
+from aimacode.search import Node, astar_search, uniform_cost_search
+from aimacode.utils import PriorityQueue
+
+from my_air_cargo_problems import air_cargo_p1
+
+
+class TestPriorityQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.costs = {}
+        self.frontier = PriorityQueue(min, lambda node: self.costs[node])
+
+    def push(self, state, cost):
+        node = Node(state)
+        self.costs[node] = cost
+        self.frontier.append(node)
+        return node
+
+    def test_pop_order(self):
+        for state, cost in [(1, 3), (2, 1), (3, 2)]:
+            self.push(state, cost)
+        self.assertEqual([self.frontier.pop().state for _ in range(3)], [2, 3, 1])
+        self.assertEqual(len(self.frontier), 0)
+
+    def test_decrease_key(self):
+        incumbent = self.push(1, 5)
+        self.push(2, 3)
+        child = Node(1, path_cost=1)
+        self.assertIs(self.frontier[child], incumbent)
+        del self.frontier[incumbent]
+        self.costs[child] = 1
+        self.frontier.append(child)
+        self.assertEqual(len(self.frontier), 2)
+        self.assertIs(self.frontier.pop(), child)
+        self.assertEqual(self.frontier.pop().state, 2)
+        self.assertNotIn(child, self.frontier)
+        self.assertFalse(self.frontier)
+
+    def test_removed_entries_are_dropped(self):
+        for cost in range(100, 0, -1):
+            self.push(1, cost)
+        self.assertEqual(len(self.frontier), 1)
+        self.assertLess(len(self.frontier._queue), 40)
+        self.assertEqual(self.costs[self.frontier.pop()], 1)
+
+
+class TestBestFirstSearch(unittest.TestCase):
+
+    def test_optimal_plans(self):
+        p1 = air_cargo_p1()
+        self.assertEqual(len(uniform_cost_search(p1).solution()), 6)
+        self.assertEqual(len(astar_search(p1, p1.h_ignore_preconditions).solution()), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()